@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+
+
+class OrjsonResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+def ndjson_line(event: dict) -> bytes:
+    return orjson.dumps(event) + b"\n"
@@ -1,16 +1,97 @@
 from __future__ import annotations
-from fastapi import APIRouter, Query
 
+import time
+
+from fastapi import APIRouter, Body, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from api.responses import OrjsonResponse, ndjson_line
+
+from core import timing
+from core.config import BATCH_MAX_QUERIES, MAX_TOP_K, SEARCH_ASYNC
 from services.search_service import SearchService
 
 router = APIRouter()
 service = SearchService()
 
 
-@router.get("/search")
-def search(
+@router.get("/search", response_class=OrjsonResponse)
+async def search(
+    query: str | None = Query(None, min_length=2),
+    q: str | None = Query(None, min_length=2),
+    top_k: int = Query(1, ge=1, le=MAX_TOP_K),
+    debug: bool = Query(False),
+):
+    raw_query = (query or q or "").strip()
+    timings = timing.start(force=debug)
+    started = time.perf_counter()
+
+    if SEARCH_ASYNC:
+        payload = await service.asearch(raw_query, top_k)
+    else:
+        payload = await run_in_threadpool(service.search, raw_query, top_k)
+
+    headers = {}
+    if timings is not None:
+        timings.add("total", time.perf_counter() - started)
+        headers["Server-Timing"] = timings.header()
+        if debug:
+            payload = {**payload, "timings": timings.as_dict()}
+    return OrjsonResponse(payload, headers=headers)
+
+
+@router.get("/search/stream")
+async def search_stream(
+    query: str | None = Query(None, min_length=2),
+    q: str | None = Query(None, min_length=2),
+    top_k: int = Query(1, ge=1, le=MAX_TOP_K),
+    debug: bool = Query(False),
+):
+    raw_query = (query or q or "").strip()
+
+    async def events():
+        timings = timing.start(force=debug) if debug else None
+        started = time.perf_counter()
+        async for event in service.astream(raw_query, top_k):
+            if timings is not None and event["type"] == "done":
+                timings.add("total", time.perf_counter() - started)
+                event = {**event, "timings": timings.as_dict()}
+            yield ndjson_line(event)
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@router.post("/search/batch", response_class=OrjsonResponse)
+async def search_batch(
+    queries: list[str] = Body(..., embed=True, min_length=1, max_length=BATCH_MAX_QUERIES),
+    top_k: int = Body(1, embed=True, ge=1, le=MAX_TOP_K),
+    stream: bool = Body(False, embed=True),
+):
+    raw_queries = [(raw_query or "").strip() for raw_query in queries]
+
+    if stream:
+        async def events():
+            async for indices, payload in service.abatch(raw_queries, top_k):
+                for index in indices:
+                    yield ndjson_line({"type": "result", "index": index, "query": raw_queries[index], **payload})
+            yield ndjson_line({"type": "done"})
+
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
+    results: list[dict | None] = [None] * len(raw_queries)
+    async for indices, payload in service.abatch(raw_queries, top_k):
+        for index in indices:
+            results[index] = {"query": raw_queries[index], **payload}
+    return OrjsonResponse({"results": results})
+
+
+@router.get("/compare", response_class=OrjsonResponse)
+async def compare(
     query: str | None = Query(None, min_length=2),
     q: str | None = Query(None, min_length=2),
+    by: str | None = Query(None),
 ):
     raw_query = (query or q or "").strip()
-    return service.search(raw_query)
+    group_by = [dim.strip().lower() for dim in by.split(",") if dim.strip()] if by else None
+    return OrjsonResponse(await service.acompare(raw_query, group_by))
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+
+from core.health import HEALTH
+from core.parsers import PARSERS
+
+router = APIRouter()
+
+
+@router.get("/shops")
+def shops():
+    return HEALTH.snapshot({parser.shop: parser.timeout for parser in PARSERS})
@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -5,11 +7,52 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
+from api.metrics import router as metrics_router
 from api.search import router as search_router
+from api.shops import router as shops_router
+from core.compression import CompressionMiddleware
+from core.config import CATALOG_ENABLED, HTTP_KEEPALIVE_INTERVAL, HTTP_WARMUP, SEARCH_ASYNC
+from core.http import (
+    close_async_clients,
+    close_session,
+    install_dns_cache,
+    keep_alive,
+    uninstall_dns_cache,
+    warm_up,
+)
+from core.metrics import observe_request
+from core.parsers import PARSERS
+from core.workers import shutdown_parse_pool, warm_parse_pool
+from services.catalog import CATALOG
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    install_dns_cache(PARSERS)
+    await asyncio.to_thread(warm_parse_pool)
+    tasks = []
+    if HTTP_WARMUP:
+        tasks.append(asyncio.create_task(warm_up(PARSERS, use_async=SEARCH_ASYNC)))
+    if HTTP_KEEPALIVE_INTERVAL > 0:
+        tasks.append(asyncio.create_task(keep_alive(PARSERS, HTTP_KEEPALIVE_INTERVAL, use_async=SEARCH_ASYNC)))
+    if CATALOG_ENABLED:
+        tasks.append(asyncio.create_task(CATALOG.run()))
+
+    yield
+
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    await close_async_clients()
+    close_session()
+    uninstall_dns_cache()
+    shutdown_parse_pool()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Apple Devices Search")
+    app = FastAPI(title="Apple Devices Search", lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
@@ -17,6 +60,8 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(CompressionMiddleware)
+    app.middleware("http")(observe_request)
 
     static_dir = Path(__file__).resolve().parent / "frontend"
     app.mount("/frontend", StaticFiles(directory=static_dir), name="frontend")
@@ -26,4 +71,6 @@ def create_app() -> FastAPI:
         return FileResponse(static_dir / "index.html")
 
     app.include_router(search_router)
+    app.include_router(shops_router)
+    app.include_router(metrics_router)
     return app
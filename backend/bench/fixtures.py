@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from core.parsers import PARSERS
+
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+MANIFEST = "manifest.json"
+
+_SLUG_RE = re.compile(r"[^0-9a-zа-я]+")
+
+
+def _slug(text: str) -> str:
+    return _SLUG_RE.sub("-", text.lower().replace("ё", "е")).strip("-") or "query"
+
+
+def _params_key(params: Any) -> str:
+    return json.dumps(sorted((str(k), str(v)) for k, v in dict(params or {}).items()), ensure_ascii=False)
+
+
+def load_manifest(root: Path = FIXTURE_DIR) -> list[dict]:
+    path = root / MANIFEST
+    if not path.exists():
+        return []
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_manifest(entries: list[dict], root: Path = FIXTURE_DIR) -> None:
+    root.mkdir(parents=True, exist_ok=True)
+    (root / MANIFEST).write_text(json.dumps(entries, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def record(parser, query: str, root: Path = FIXTURE_DIR) -> list[dict]:
+    entries = [e for e in load_manifest(root) if not (e["shop"] == parser.shop and e["query"] == query)]
+    recorded = []
+
+    for page in range(1, parser.max_pages + 1):
+        params = parser.params(query, page)
+        response = parser.session.get(
+            parser.base_url,
+            params=params,
+            headers=parser.headers,
+            timeout=parser.timeout,
+            verify=parser.verify,
+        )
+
+        file = Path(parser.shop) / f"{_slug(query)}-p{page}.html"
+        (root / file).parent.mkdir(parents=True, exist_ok=True)
+        (root / file).write_text(response.text, encoding="utf-8")
+
+        recorded.append({
+            "shop": parser.shop,
+            "query": query,
+            "page": page,
+            "params": {k: str(v) for k, v in params.items()},
+            "status": response.status_code,
+            "file": file.as_posix(),
+        })
+
+        if response.status_code != 200 or parser.parse_page(response.text) is None:
+            break
+
+    save_manifest(entries + recorded, root)
+    return recorded
+
+
+class ReplayResponse:
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers: dict[str, str] = {}
+
+
+class ReplayStore:
+    def __init__(self, root: Path = FIXTURE_DIR):
+        self.root = root
+        self.entries = load_manifest(root)
+        self._by_params = {(e["shop"], _params_key(e["params"])): e for e in self.entries}
+        self.requests = 0
+
+    def lookup(self, shop: str, params: Any) -> tuple[int, str]:
+        self.requests += 1
+        entry = self._by_params.get((shop, _params_key(params)))
+        if entry is None:
+            return 404, ""
+        return entry["status"], (self.root / entry["file"]).read_text(encoding="utf-8")
+
+    def pages(self, shop: str | None = None) -> list[dict]:
+        return [e for e in self.entries if shop is None or e["shop"] == shop]
+
+    def read(self, entry: dict) -> str:
+        return (self.root / entry["file"]).read_text(encoding="utf-8")
+
+
+class ReplaySession:
+    def __init__(self, shop: str, store: ReplayStore | None = None):
+        self.shop = shop
+        self.store = store or ReplayStore()
+
+    def get(self, url: str, params=None, **kwargs) -> ReplayResponse:
+        return ReplayResponse(*self.store.lookup(self.shop, params))
+
+
+def replay_client(shop: str, store: ReplayStore | None = None) -> httpx.AsyncClient:
+    store = store or ReplayStore()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status, text = store.lookup(shop, request.url.params)
+        return httpx.Response(status, text=text)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def replay_parser(parser_cls, store: ReplayStore | None = None):
+    store = store or ReplayStore()
+    shop = parser_cls.shop
+    return parser_cls(session=ReplaySession(shop, store), client=replay_client(shop, store))
+
+
+def parser_classes() -> list[type]:
+    return [type(p) for p in PARSERS]
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+
+from bench.fixtures import FIXTURE_DIR, ReplayStore, parser_classes
+from core.workers import create_parse_pool
+from matching.parser import _parse_normalized
+from parsers.base import parse_records
+
+
+def _parse(parser_cls, html: str, cold: bool):
+    if cold:
+        _parse_normalized.cache_clear()
+    return parse_records(parser_cls, html)
+
+
+def load_pages(store: ReplayStore) -> list[tuple[type, str]]:
+    pages = []
+    for parser_cls in parser_classes():
+        for entry in store.pages(parser_cls.shop):
+            if entry["status"] == 200:
+                pages.append((parser_cls, store.read(entry)))
+    return pages
+
+
+def run(executor: Executor | None, pages: list[tuple[type, str]], repeat: int, cold: bool) -> tuple[int, int, float]:
+    jobs = pages * repeat
+    started = time.perf_counter()
+    if executor is None:
+        results = [_parse(parser_cls, html, cold) for parser_cls, html in jobs]
+    else:
+        futures = [executor.submit(_parse, parser_cls, html, cold) for parser_cls, html in jobs]
+        results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - started
+    return len(jobs), sum(len(records or []) for records in results), elapsed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Compare threaded and process-pool page parsing.")
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--fixtures", type=Path, default=FIXTURE_DIR)
+    ap.add_argument("--cold", action="store_true", help="clear the parse_text memo before every page")
+    args = ap.parse_args()
+
+    pages = load_pages(ReplayStore(args.fixtures))
+    if not pages:
+        print("No fixtures recorded. Run: python -m bench.record \"iphone 16 pro 256\"")
+        return
+
+    print(f"cpus: {os.cpu_count()}")
+    print(f"{'mode':12} {'workers':>7} {'pages':>7} {'pages/s':>10} {'items/s':>10}")
+
+    def report(mode: str, workers: int, result: tuple[int, int, float]) -> None:
+        count, items, elapsed = result
+        print(f"{mode:12} {workers:7} {count:7} {count / elapsed:10.1f} {items / elapsed:10.1f}")
+
+    report("inline", 1, run(None, pages, args.repeat, args.cold))
+
+    with ThreadPoolExecutor(max_workers=args.workers) as threads:
+        run(threads, pages, 1, args.cold)
+        report("threads", args.workers, run(threads, pages, args.repeat, args.cold))
+
+    processes = create_parse_pool(args.workers)
+    try:
+        run(processes, pages, 1, args.cold)
+        report("processes", args.workers, run(processes, pages, args.repeat, args.cold))
+    finally:
+        processes.shutdown()
+
+
+if __name__ == "__main__":
+    main()
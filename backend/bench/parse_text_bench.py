@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import time
+from pathlib import Path
+
+from bench.fixtures import FIXTURE_DIR, ReplayStore, parser_classes
+from matching.dictionaries import COLORS, STORAGE
+from matching.parser import _normalize_text, _parse_normalized, _scan_terms, parse_cache_stats, parse_text
+
+
+_MODELS = [
+    "Apple iPhone 16 Pro Max", "iPhone 15 Plus", "Смартфон Apple iPhone 13 mini", "iPhone 17 Pro",
+    "MacBook Air 13 M3", "Apple MacBook Pro 14 M4 Pro", "MacBook Air 15\" M2",
+    "iPad Pro 11 M4", "iPad Air 13 M2", "iPad mini 8.3", "iPad 10,9 Wi-Fi",
+    "AirPods Pro 2", "AirPods 4 с шумоподавлением", "AirPods Max", "AirPods 3rd gen",
+]
+_STORAGE = ["128GB", "256 Гб", "512 ГБ", "1TB", "8/256GB", "16GB 512GB", ""]
+_COLORS = ["Desert Titanium", "темная ночь", "Starlight", "sky blue", "синий", "Space Gray", "Чёрный", "Cosmic Orange", ""]
+
+
+def synthetic_titles() -> list[str]:
+    return [" ".join(p for p in parts if p) for parts in itertools.product(_MODELS, _STORAGE, _COLORS)]
+
+
+def fixture_titles(root: Path) -> list[str]:
+    store = ReplayStore(root)
+    titles = []
+    for parser_cls in parser_classes():
+        for entry in store.pages(parser_cls.shop):
+            if entry["status"] == 200:
+                titles.extend(title for title, _, _ in parser_cls.parse_page(store.read(entry)) or [])
+    return titles
+
+
+def linear_terms(text: str) -> tuple[str | None, str | None]:
+    storage = next((key for key, values in STORAGE.items() if any(v in text for v in values)), None)
+    color = next((key for key, values in COLORS.items() if any(v in text for v in values)), None)
+    return storage, color
+
+
+def _best_of(fn, titles: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for title in titles:
+            fn(title)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Microbenchmark matching.parser.parse_text.")
+    ap.add_argument("--repeat", type=int, default=7)
+    ap.add_argument("--fixtures", type=Path, default=FIXTURE_DIR)
+    args = ap.parse_args()
+
+    titles = fixture_titles(args.fixtures) or synthetic_titles()
+    normalized = [_normalize_text(t) for t in titles]
+
+    mismatches = sum(linear_terms(t) != _scan_terms(t) for t in normalized)
+    print(f"titles: {len(titles)}, dictionary mismatches: {mismatches}")
+
+    for name, fn, corpus in (
+        ("terms linear", linear_terms, normalized),
+        ("terms automaton", _scan_terms, normalized),
+        ("parse uncached", lambda t: _parse_normalized.__wrapped__(_normalize_text(t)), titles),
+        ("parse_text memo", parse_text, titles),
+    ):
+        elapsed = _best_of(fn, corpus, args.repeat)
+        print(f"{name:16} {len(corpus) / elapsed:12,.0f} titles/s {elapsed / len(corpus) * 1e6:8.2f} us/title")
+
+    stats = parse_cache_stats()
+    print(f"parse cache: {stats['size']}/{stats['maxsize']} entries, hit ratio {stats['hit_ratio']:.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from bench.fixtures import FIXTURE_DIR, ReplayStore, parser_classes, replay_parser
+from core.pages import PAGES
+
+
+def _rate(count: int, elapsed: float) -> float:
+    return count / elapsed if elapsed > 0 else 0.0
+
+
+def bench_extract(parse_page, shop: str, store: ReplayStore, repeat: int) -> tuple[int, int, float]:
+    pages = [store.read(e) for e in store.pages(shop) if e["status"] == 200]
+    items = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            items += len(parse_page(html) or [])
+    return len(pages) * repeat, items, time.perf_counter() - started
+
+
+def mismatches(parser_cls, store: ReplayStore) -> list[str]:
+    return [
+        entry["file"]
+        for entry in store.pages(parser_cls.shop)
+        if entry["status"] == 200
+        and parser_cls.parse_page_lxml(store.read(entry)) != parser_cls.parse_page_soup(store.read(entry))
+    ]
+
+
+def bench_search(parser_cls, store: ReplayStore, repeat: int, page_cache: bool = False) -> tuple[int, int, float]:
+    queries = sorted({e["query"] for e in store.pages(parser_cls.shop)})
+    parser = replay_parser(parser_cls, store)
+    items = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            if not page_cache:
+                PAGES.clear()
+            items += len(parser.search(query, 30))
+    return len(queries) * repeat, items, time.perf_counter() - started
+
+
+async def bench_asearch(parser_cls, store: ReplayStore, repeat: int, page_cache: bool = False) -> tuple[int, int, float]:
+    queries = sorted({e["query"] for e in store.pages(parser_cls.shop)})
+    parser = replay_parser(parser_cls, store)
+    items = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            if not page_cache:
+                PAGES.clear()
+            items += len(await parser.asearch(query, 30))
+    elapsed = time.perf_counter() - started
+    await parser.client.aclose()
+    return len(queries) * repeat, items, elapsed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark shop parsers against recorded fixtures.")
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--fixtures", type=Path, default=FIXTURE_DIR)
+    ap.add_argument("--page-cache", action="store_true", help="keep unchanged pages between runs")
+    args = ap.parse_args()
+
+    store = ReplayStore(args.fixtures)
+    if not store.entries:
+        print("No fixtures recorded. Run: python -m bench.record \"iphone 16 pro 256\"")
+        return
+
+    failed = []
+    print(f"{'shop':12} {'stage':8} {'runs':>6} {'pages/s':>10} {'items/s':>10}")
+    for parser_cls in parser_classes():
+        if not store.pages(parser_cls.shop):
+            continue
+
+        rates = {}
+        for stage, parse_page in (("soup", parser_cls.parse_page_soup), ("lxml", parser_cls.parse_page_lxml)):
+            pages, items, elapsed = bench_extract(parse_page, parser_cls.shop, store, args.repeat)
+            rates[stage] = _rate(pages, elapsed)
+            print(f"{parser_cls.shop:12} {stage:8} {pages:6} {rates[stage]:10.1f} {_rate(items, elapsed):10.1f}")
+
+        differ = mismatches(parser_cls, store)
+        speedup = rates["lxml"] / rates["soup"] if rates["soup"] else 0.0
+        status = "same output" if not differ else f"OUTPUT DIFFERS: {', '.join(differ)}"
+        print(f"{parser_cls.shop:12} {'lxml/soup':8} {'':6} {speedup:9.1f}x {status}")
+        failed.extend(differ)
+
+        runs, items, elapsed = bench_search(parser_cls, store, args.repeat, args.page_cache)
+        print(f"{parser_cls.shop:12} {'search':8} {runs:6} {'':>10} {_rate(items, elapsed):10.1f}")
+
+        runs, items, elapsed = asyncio.run(bench_asearch(parser_cls, store, args.repeat, args.page_cache))
+        print(f"{parser_cls.shop:12} {'asearch':8} {runs:6} {'':>10} {_rate(items, elapsed):10.1f}")
+
+    if failed:
+        sys.exit(f"lxml and soup parsers disagree on {len(failed)} page(s)")
+
+
+if __name__ == "__main__":
+    main()
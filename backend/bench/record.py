@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import argparse
+
+from bench.fixtures import FIXTURE_DIR, record
+from core.parsers import PARSERS
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Record shop search pages as replay fixtures.")
+    ap.add_argument("queries", nargs="+")
+    ap.add_argument("--shop", action="append", help="only record these shops")
+    args = ap.parse_args()
+
+    for parser in PARSERS:
+        if args.shop and parser.shop not in args.shop:
+            continue
+        for query in args.queries:
+            try:
+                pages = record(parser, query)
+            except Exception as e:
+                print(f"{parser.shop:12} {query!r}: {e}", flush=True)
+                continue
+            print(f"{parser.shop:12} {query!r}: {len(pages)} page(s)", flush=True)
+
+    print(f"fixtures: {FIXTURE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
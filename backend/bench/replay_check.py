@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from bench.fixtures import FIXTURE_DIR, ReplayStore, parser_classes, replay_parser
+from bench.parsers_bench import mismatches
+from bench.synthetic import load_expected
+from core.pages import PAGES
+
+
+def _items(results: list[dict]) -> list[list]:
+    return [[item["title"], item["url"], item["price"]] for item in results]
+
+
+def _diff(got: list[list], want: list[list]) -> str:
+    if len(got) != len(want):
+        return f"{len(got)} item(s), expected {len(want)}"
+    for index, (a, b) in enumerate(zip(got, want)):
+        if a != b:
+            return f"item {index}: {a!r} != {b!r}"
+    return ""
+
+
+def check(root: Path) -> int:
+    store = ReplayStore(root)
+    expected = load_expected(root)
+    failures = 0
+
+    for parser_cls in parser_classes():
+        differ = mismatches(parser_cls, store)
+        status = f"FAIL lxml != soup on {', '.join(differ)}" if differ else "ok"
+        print(f"{parser_cls.shop:12} {'parsers':8}: {status}", flush=True)
+        failures += len(differ)
+
+        parsers = {"search": replay_parser(parser_cls, store), "asearch": replay_parser(parser_cls, store)}
+        for query, case in expected.get(parser_cls.shop, {}).items():
+            for mode, parser in parsers.items():
+                PAGES.clear()
+                parser.page_size = case["page_size"]
+                requests = store.requests
+                if mode == "search":
+                    results = parser.search(query, case["limit"])
+                else:
+                    results = asyncio.run(parser.asearch(query, case["limit"]))
+
+                problem = _diff(_items(results), case["items"])
+                if not problem and mode == "search" and store.requests - requests != case["pages"]:
+                    problem = f"{store.requests - requests} page request(s), expected {case['pages']}"
+                status = f"FAIL {problem}" if problem else "ok"
+                print(f"{parser_cls.shop:12} {mode:8} {query!r}: {status}", flush=True)
+                failures += bool(problem)
+
+    return failures
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Replay fixtures through search/asearch and compare with expected items.")
+    ap.add_argument("--fixtures", type=Path, default=FIXTURE_DIR)
+    args = ap.parse_args()
+
+    if not load_expected(args.fixtures):
+        print("No expected output. Run: python -m bench.synthetic")
+        sys.exit(1)
+
+    failures = check(args.fixtures)
+    if failures:
+        print(f"{failures} check(s) failed")
+        sys.exit(1)
+    print("all checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from bench.parse_text_bench import synthetic_titles
+from core.compression import compress
+
+
+_SHOPS = ["AppleMarket", "AppleGod", "iShop", "MacApples", "Techmart"]
+
+
+def search_payload(titles: list[str], rng: random.Random, offers: int) -> dict:
+    results = []
+    for i in range(offers):
+        shop = _SHOPS[i % len(_SHOPS)]
+        results.append({
+            "shop": shop,
+            "title": rng.choice(titles),
+            "price": rng.randint(20_000, 400_000),
+            "url": f"https://{shop.lower()}.ru/product/{rng.randint(1, 10**6)}",
+        })
+    results.sort(key=lambda offer: offer["price"])
+    return {
+        "results": results,
+        "shops": {shop: "ok" for shop in _SHOPS},
+        "partial": False,
+        "age": 0.0,
+        "stale": False,
+    }
+
+
+def batch_payload(titles: list[str], rng: random.Random, queries: int, top_k: int) -> dict:
+    return {
+        "results": [
+            {"query": rng.choice(titles), **search_payload(titles, rng, top_k * len(_SHOPS))}
+            for _ in range(queries)
+        ]
+    }
+
+
+def stdlib_encode(payload: dict) -> bytes:
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def timed(fn, payload, repeat: int) -> tuple[float, bytes]:
+    result = fn(payload)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(payload)
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Measure response encode time and bytes on the wire.")
+    ap.add_argument("--repeat", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    titles = synthetic_titles()
+    payloads = [
+        ("search k=1", search_payload(titles, rng, 5)),
+        ("search k=10", search_payload(titles, rng, 50)),
+        ("batch 50x3", batch_payload(titles, rng, 50, 3)),
+        ("batch 200x3", batch_payload(titles, rng, 200, 3)),
+    ]
+
+    print(
+        f"{'payload':12} {'json us':>9} {'orjson us':>10} {'bytes':>9} "
+        f"{'gzip':>8} {'gzip us':>9} {'br':>8} {'br us':>9}"
+    )
+    for name, payload in payloads:
+        repeat = max(1, args.repeat // max(1, len(payload["results"]) // 10))
+        stdlib_time, _ = timed(stdlib_encode, payload, repeat)
+        orjson_time, body = timed(orjson.dumps, payload, repeat)
+        gzip_time, gzipped = timed(lambda b: compress(b, "gzip"), body, repeat)
+        br_time, brotlied = timed(lambda b: compress(b, "br"), body, repeat)
+        print(
+            f"{name:12} {stdlib_time * 1e6:9.1f} {orjson_time * 1e6:10.1f} {len(body):9} "
+            f"{len(gzipped):8} {gzip_time * 1e6:9.1f} {len(brotlied):8} {br_time * 1e6:9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+from pathlib import Path
+
+from bench.fixtures import FIXTURE_DIR, _slug, load_manifest, save_manifest
+from core.parsers import PARSERS
+
+
+EXPECTED = "expected.json"
+PAGE_SIZE = 24
+PAGE_SIZES = {
+    "iphone 16 pro 256": (PAGE_SIZE, 6),
+    "macbook air 13 m3 256": (PAGE_SIZE, 6),
+    "airpods pro 2": (9,),
+}
+QUERIES = list(PAGE_SIZES)
+LIMIT = 30
+
+_TITLES = {
+    "iphone 16 pro 256": [
+        "Apple iPhone 16 Pro 256GB Desert Titanium",
+        "iPhone 16 Pro 256 ГБ черный титан",
+        "Смартфон Apple iPhone 16 Pro 256Gb Natural Titanium",
+        "iPhone 16 Pro Max 256GB White Titanium",
+        "Чехол для iPhone 16 Pro прозрачный",
+        "iPhone 16 256 Гб розовый",
+    ],
+    "macbook air 13 m3 256": [
+        "MacBook Air 13 M3 8/256GB Midnight",
+        "Apple MacBook Air 13\" M3 16GB 256GB Starlight",
+        "Ноутбук Apple MacBook Air 13 M3 256 ГБ серебристый",
+        "MacBook Air 15 M3 8GB 256GB Space Gray",
+        "Чехол для MacBook Air 13 M3",
+    ],
+    "airpods pro 2": [
+        "Apple AirPods Pro 2 USB-C",
+        "Наушники AirPods Pro 2 с шумоподавлением",
+        "Чехол для AirPods Pro 2",
+    ],
+}
+
+_FILLER = (
+    "<nav class='menu'><ul>"
+    + "".join(f"<li><a href='/catalog/{i}/'>Категория {i}</a></li>" for i in range(12))
+    + "</ul></nav>"
+)
+
+
+def _card(shop: str, href: str, title: str, price: int | None) -> str:
+    if shop == "AppleGod":
+        meta = f'<meta itemprop="price" content="{price}.00">' if price is not None else ""
+        return (
+            f'<div class="products__card card-product"><div class="card-product__title">'
+            f'<a href="{href}"> {title} </a></div><div>{meta}</div></div>'
+        )
+    if shop == "AppleMarket":
+        span = f'<span class="product__price">{price:,} ₽</span>'.replace(",", " ") if price is not None else ""
+        return (
+            f'<li class="search-page__results-item"><article class="product"><h3 class="product__name">'
+            f'<a href="https://apple-market.ru{href}">{title}</a></h3>'
+            f'<div class="product__prices">{span}</div></article></li>'
+        )
+    if shop == "iShop":
+        price_div = f'<div class="catalog-card__price">{price:,} ₽</div>'.replace(",", " ") if price is not None else ""
+        return (
+            f'<div class="catalog-card" data-entity="item"><a class="catalog-card__name" href="{href}">'
+            f'<span>{title}</span></a>{price_div}</div>'
+        )
+    if shop == "MacApples":
+        meta = f'<meta itemprop="price" content="{price}">' if price is not None else ""
+        return (
+            f'<div class="single-product grid-v single-product-v2"><div class="pro-title">'
+            f'<a itemprop="name" href="{href}">{title}</a></div>{meta}</div>'
+        )
+    if shop == "Techmart":
+        price_p = f'<p class="product__price">{price:,} руб.</p>'.replace(",", " ") if price is not None else ""
+        return (
+            f'<div class="product__item"><a class="product__title" href="https://techmart.ru{href}">{title}</a>'
+            f"{price_p}</div>"
+        )
+    raise ValueError(f"Unknown shop: {shop}")
+
+
+def _url(shop: str, href: str) -> str:
+    return {
+        "AppleGod": "https://applegod.ru",
+        "AppleMarket": "https://apple-market.ru",
+        "iShop": "https://i-shop.ru",
+        "MacApples": "https://macapples.ru",
+        "Techmart": "https://techmart.ru",
+    }[shop] + href
+
+
+def _page(shop: str, cards: list[str]) -> str:
+    body = "".join(cards)
+    if shop == "AppleMarket":
+        body = f'<ul class="search-page__results">{body}</ul>'
+    if shop == "Techmart":
+        body = f'<div id="productlist">{body}</div>'
+    return (
+        "<!-- synthetic fixture: generated by bench/synthetic.py, not a recorded shop page -->\n"
+        f"<html><head><title>{shop}</title></head><body>{_FILLER}{body}{_FILLER}</body></html>"
+    )
+
+
+def generate(shop: str, query: str) -> tuple[list[str], list[list]]:
+    rng = random.Random(f"{shop}:{query}")
+    pages = []
+    expected = []
+    number = 0
+    for size in PAGE_SIZES[query]:
+        cards = []
+        for _ in range(size):
+            number += 1
+            title = f"{rng.choice(_TITLES[query])} #{number}"
+            href = f"/product/{_slug(shop)}-{_slug(query)}-{number}/"
+            price = None if number % 7 == 0 else rng.randrange(20000, 300000, 10)
+            cards.append(_card(shop, href, title, price))
+            if price is not None and len(expected) < LIMIT:
+                expected.append([title, _url(shop, href), price])
+        pages.append(_page(shop, cards))
+    return pages, expected
+
+
+def load_expected(root: Path = FIXTURE_DIR) -> dict:
+    path = root / EXPECTED
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def write(root: Path = FIXTURE_DIR) -> int:
+    generated = {(p.shop, q) for p in PARSERS for q in QUERIES}
+    entries = [e for e in load_manifest(root) if (e["shop"], e["query"]) not in generated]
+    expected = load_expected(root)
+
+    for parser in PARSERS:
+        for query in QUERIES:
+            pages, items = generate(parser.shop, query)
+            for page, html in enumerate(pages, 1):
+                file = Path(parser.shop) / f"{_slug(query)}-p{page}.html"
+                (root / file).parent.mkdir(parents=True, exist_ok=True)
+                (root / file).write_text(html, encoding="utf-8")
+                entries.append({
+                    "shop": parser.shop,
+                    "query": query,
+                    "page": page,
+                    "params": {k: str(v) for k, v in parser.params(query, page).items()},
+                    "status": 200,
+                    "file": file.as_posix(),
+                    "synthetic": True,
+                })
+            expected.setdefault(parser.shop, {})[query] = {
+                "limit": LIMIT,
+                "page_size": PAGE_SIZE,
+                "pages": len(pages),
+                "synthetic": True,
+                "items": items,
+            }
+
+    save_manifest(entries, root)
+    (root / EXPECTED).write_text(json.dumps(expected, ensure_ascii=False, indent=2), encoding="utf-8")
+    return len(generated)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Write synthetic replay fixtures and their expected search output.")
+    ap.add_argument("--fixtures", type=Path, default=FIXTURE_DIR)
+    args = ap.parse_args()
+
+    count = write(args.fixtures)
+    print(f"{count} synthetic shop/query pair(s) written to {args.fixtures}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import gzip
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+
+from core.config import BROTLI_QUALITY, COMPRESS_MIN_SIZE, GZIP_LEVEL
+
+
+_STREAMING_TYPES = ("application/x-ndjson", "text/event-stream")
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, *params = (value.strip() for value in part.split(";"))
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if name:
+            accepted[name] = q
+
+    weights = {encoding: accepted.get(encoding, accepted.get("*", 0.0)) for encoding in ("br", "gzip")}
+    encoding = max(weights, key=weights.get)
+    return encoding if weights[encoding] > 0 else None
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = GZIP_LEVEL, brotli_quality: int = BROTLI_QUALITY) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESS_MIN_SIZE,
+        gzip_level: int = GZIP_LEVEL,
+        brotli_quality: int = BROTLI_QUALITY,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or headers.get("content-type", "").startswith(_STREAMING_TYPES)
+            ):
+                await send(start)
+                start = None
+                await send(message)
+                return
+
+            body = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            start = None
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import os
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    return int(value)
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    return float(value)
+
+
+SEARCH_ASYNC = _env_bool("SEARCH_ASYNC", True)
+PARSER_BACKEND = os.environ.get("PARSER_BACKEND", "lxml").strip().lower()
+SEARCH_DEADLINE = _env_float("SEARCH_DEADLINE", 8.0)
+MAX_TOP_K = _env_int("MAX_TOP_K", 10)
+
+CACHE_SOFT_TTL = _env_float("CACHE_SOFT_TTL", 300.0)
+CACHE_HARD_TTL = _env_float("CACHE_HARD_TTL", 1800.0)
+PARTIAL_CACHE_TTL = _env_float("PARTIAL_CACHE_TTL", 30.0)
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory").strip().lower()
+CACHE_PATH = os.environ.get("CACHE_PATH", "data/search_cache.sqlite3")
+CACHE_BUSY_TIMEOUT = _env_float("CACHE_BUSY_TIMEOUT", 0.05)
+
+HTTP_KEEPALIVE_EXPIRY = _env_float("HTTP_KEEPALIVE_EXPIRY", 90.0)
+HTTP_WARMUP = _env_bool("HTTP_WARMUP", True)
+HTTP_KEEPALIVE_INTERVAL = _env_float("HTTP_KEEPALIVE_INTERVAL", 45.0)
+DNS_CACHE_TTL = _env_float("DNS_CACHE_TTL", 300.0)
+
+HEALTH_WINDOW = _env_int("HEALTH_WINDOW", 200)
+HEALTH_MIN_SAMPLES = _env_int("HEALTH_MIN_SAMPLES", 20)
+TIMEOUT_P99_FACTOR = _env_float("TIMEOUT_P99_FACTOR", 1.5)
+TIMEOUT_MIN = _env_float("TIMEOUT_MIN", 2.0)
+BREAKER_THRESHOLD = _env_int("BREAKER_THRESHOLD", 5)
+BREAKER_COOLDOWN = _env_float("BREAKER_COOLDOWN", 60.0)
+
+CATALOG_ENABLED = _env_bool("CATALOG_ENABLED", False)
+CATALOG_INTERVAL = _env_float("CATALOG_INTERVAL", 900.0)
+CATALOG_LIMIT = _env_int("CATALOG_LIMIT", 100)
+CATALOG_QUERIES = tuple(
+    q.strip()
+    for q in os.environ.get(
+        "CATALOG_QUERIES",
+        "iphone 14,iphone 15,iphone 16,iphone 16 pro,iphone 17,iphone 17 pro,"
+        "macbook air,macbook pro,ipad,ipad air,ipad pro,airpods",
+    ).split(",")
+    if q.strip()
+)
+
+PAGE_CACHE_SIZE = _env_int("PAGE_CACHE_SIZE", 2048)
+
+SERVER_TIMING = _env_bool("SERVER_TIMING", True)
+
+BATCH_MAX_QUERIES = _env_int("BATCH_MAX_QUERIES", 200)
+BATCH_CONCURRENCY = _env_int("BATCH_CONCURRENCY", 4)
+
+PARSE_WORKERS = _env_int("PARSE_WORKERS", 0)
+
+COMPRESS_MIN_SIZE = _env_int("COMPRESS_MIN_SIZE", 1024)
+GZIP_LEVEL = _env_int("GZIP_LEVEL", 6)
+BROTLI_QUALITY = _env_int("BROTLI_QUALITY", 4)
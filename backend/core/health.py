@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+
+from core.config import (
+    BREAKER_COOLDOWN,
+    BREAKER_THRESHOLD,
+    HEALTH_MIN_SAMPLES,
+    HEALTH_WINDOW,
+    TIMEOUT_MIN,
+    TIMEOUT_P99_FACTOR,
+)
+
+
+def _percentile(ordered: list[float], q: float) -> float | None:
+    if not ordered:
+        return None
+    index = max(0, math.ceil(q * len(ordered)) - 1)
+    return ordered[index]
+
+
+class _ShopState:
+    __slots__ = (
+        "latencies",
+        "outcomes",
+        "calls",
+        "failures",
+        "consecutive_failures",
+        "open_until",
+        "probing",
+        "last_error",
+    )
+
+    def __init__(self, window: int):
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.last_error: str | None = None
+
+
+class HealthTracker:
+    def __init__(
+        self,
+        window: int = HEALTH_WINDOW,
+        min_samples: int = HEALTH_MIN_SAMPLES,
+        timeout_factor: float = TIMEOUT_P99_FACTOR,
+        min_timeout: float = TIMEOUT_MIN,
+        failure_threshold: int = BREAKER_THRESHOLD,
+        cool_down: float = BREAKER_COOLDOWN,
+    ):
+        self.window = window
+        self.min_samples = min_samples
+        self.timeout_factor = timeout_factor
+        self.min_timeout = min_timeout
+        self.failure_threshold = failure_threshold
+        self.cool_down = cool_down
+        self._lock = threading.Lock()
+        self._shops: dict[str, _ShopState] = {}
+
+    def _state(self, shop: str) -> _ShopState:
+        state = self._shops.get(shop)
+        if state is None:
+            state = self._shops[shop] = _ShopState(self.window)
+        return state
+
+    def allow(self, shop: str, probe_timeout: float) -> bool:
+        with self._lock:
+            state = self._shops.get(shop)
+            if state is None or not state.open_until:
+                return True
+            now = time.monotonic()
+            if state.open_until > now:
+                return False
+            state.open_until = now + probe_timeout
+            state.probing = True
+            return True
+
+    def record_success(self, shop: str, latency: float) -> None:
+        with self._lock:
+            state = self._state(shop)
+            state.calls += 1
+            state.latencies.append(latency)
+            state.outcomes.append(True)
+            state.consecutive_failures = 0
+            state.open_until = 0.0
+            state.probing = False
+
+    def record_failure(self, shop: str, error: str, latency: float | None = None) -> None:
+        with self._lock:
+            state = self._state(shop)
+            state.calls += 1
+            state.failures += 1
+            if latency is not None:
+                state.latencies.append(latency)
+            state.outcomes.append(False)
+            state.consecutive_failures += 1
+            state.last_error = error
+            if state.probing or (self.failure_threshold > 0 and state.consecutive_failures >= self.failure_threshold):
+                state.open_until = time.monotonic() + self.cool_down
+                state.probing = False
+
+    def timeout(self, shop: str, default: float) -> float:
+        with self._lock:
+            state = self._shops.get(shop)
+            if state is None or state.probing or len(state.latencies) < self.min_samples:
+                return default
+            p99 = _percentile(sorted(state.latencies), 0.99)
+        return min(default, max(self.min_timeout, p99 * self.timeout_factor))
+
+    def snapshot(self, defaults: dict[str, float] | None = None) -> dict[str, dict]:
+        defaults = defaults or {}
+        now = time.monotonic()
+        shops = {}
+        for shop in sorted(set(self._shops) | set(defaults)):
+            default = defaults.get(shop)
+            with self._lock:
+                state = self._shops.get(shop) or _ShopState(self.window)
+                ordered = sorted(state.latencies)
+                outcomes = list(state.outcomes)
+                if state.probing or 0 < state.open_until <= now:
+                    breaker = "half-open"
+                elif state.open_until > now:
+                    breaker = "open"
+                else:
+                    breaker = "closed"
+                info = {
+                    "state": breaker,
+                    "retry_in": round(max(0.0, state.open_until - now), 1),
+                    "calls": state.calls,
+                    "failures": state.failures,
+                    "consecutive_failures": state.consecutive_failures,
+                    "last_error": state.last_error,
+                }
+            info["error_rate"] = round(outcomes.count(False) / len(outcomes), 3) if outcomes else 0.0
+            for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+                value = _percentile(ordered, q)
+                info[name] = round(value, 3) if value is not None else None
+            if default is not None:
+                info["timeout"] = round(self.timeout(shop, default), 3)
+            shops[shop] = info
+        return shops
+
+
+HEALTH = HealthTracker()
@@ -1,8 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+import socket
+import threading
+import time
+from typing import Iterable
+from urllib.parse import urlsplit
+
+import httpx
 import requests
 from requests.adapters import HTTPAdapter
 
+from core.config import DNS_CACHE_TTL, HTTP_KEEPALIVE_EXPIRY
+
+
+_ASYNC_CLIENTS: dict[bool, httpx.AsyncClient] = {}
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
+
+_DNS_CACHE: dict[tuple, tuple[float, list]] = {}
+_DNS_LOCK = threading.Lock()
+_DNS_HOSTS: frozenset[str] = frozenset()
+_ORIGINAL_GETADDRINFO = socket.getaddrinfo
+
 
 def create_session(*, pool_connections: int = 20, pool_maxsize: int = 20) -> requests.Session:
     session = requests.Session()
@@ -16,3 +36,115 @@ def create_session(*, pool_connections: int = 20, pool_maxsize: int = 20) -> req
     session.mount("https://", adapter)
 
     return session
+
+
+def get_session() -> requests.Session:
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = create_session()
+        return _SESSION
+
+
+def close_session() -> None:
+    global _SESSION
+    with _SESSION_LOCK:
+        session, _SESSION = _SESSION, None
+    if session is not None:
+        session.close()
+
+
+def create_async_client(
+    *,
+    verify: bool = True,
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY,
+) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    return httpx.AsyncClient(verify=verify, limits=limits, follow_redirects=True)
+
+
+def get_async_client(*, verify: bool = True) -> httpx.AsyncClient:
+    client = _ASYNC_CLIENTS.get(verify)
+    if client is None or client.is_closed:
+        client = create_async_client(verify=verify)
+        _ASYNC_CLIENTS[verify] = client
+    return client
+
+
+async def close_async_clients() -> None:
+    clients = list(_ASYNC_CLIENTS.values())
+    _ASYNC_CLIENTS.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def _cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    if host not in _DNS_HOSTS:
+        return _ORIGINAL_GETADDRINFO(host, port, family, type, proto, flags)
+
+    key = (host, port, family, type, proto, flags)
+    now = time.monotonic()
+    with _DNS_LOCK:
+        entry = _DNS_CACHE.get(key)
+    if entry is not None and entry[0] > now:
+        return list(entry[1])
+
+    result = _ORIGINAL_GETADDRINFO(host, port, family, type, proto, flags)
+    with _DNS_LOCK:
+        _DNS_CACHE[key] = (now + DNS_CACHE_TTL, result)
+    return list(result)
+
+
+def install_dns_cache(parsers: Iterable) -> None:
+    global _DNS_HOSTS
+    if DNS_CACHE_TTL > 0:
+        _DNS_HOSTS = frozenset(urlsplit(parser.base_url).hostname for parser in parsers)
+        socket.getaddrinfo = _cached_getaddrinfo
+
+
+def uninstall_dns_cache() -> None:
+    global _DNS_HOSTS
+    socket.getaddrinfo = _ORIGINAL_GETADDRINFO
+    _DNS_HOSTS = frozenset()
+    with _DNS_LOCK:
+        _DNS_CACHE.clear()
+
+
+async def _touch(client: httpx.AsyncClient, url: str, headers: dict, timeout: float) -> None:
+    try:
+        await client.head(url, headers=headers, timeout=timeout)
+    except (httpx.HTTPError, OSError) as e:
+        print(f"Warm-up {url}: {e!r}", flush=True)
+
+
+def _touch_sync(session: requests.Session, url: str, headers: dict, timeout: float, verify: bool) -> None:
+    try:
+        session.head(url, headers=headers, timeout=timeout, verify=verify)
+    except (requests.RequestException, OSError) as e:
+        print(f"Warm-up {url}: {e!r}", flush=True)
+
+
+async def warm_up(parsers: Iterable, *, use_async: bool = True) -> None:
+    calls = []
+    for parser in parsers:
+        if use_async:
+            client = parser.client or get_async_client(verify=parser.verify)
+            calls.append(_touch(client, parser.base_url, parser.headers, parser.timeout))
+        else:
+            calls.append(asyncio.to_thread(
+                _touch_sync, parser.session, parser.base_url, parser.headers, parser.timeout, parser.verify
+            ))
+    await asyncio.gather(*calls)
+
+
+async def keep_alive(parsers: Iterable, interval: float, *, use_async: bool = True) -> None:
+    parsers = list(parsers)
+    while True:
+        await asyncio.sleep(interval)
+        await warm_up(parsers, use_async=use_async)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import time
+
+from prometheus_client import REGISTRY, Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from core.pages import PAGES
+from matching.parser import parse_cache_stats
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time until the response starts, per route.",
+    ["route", "method"],
+)
+CACHE_LOOKUPS = Counter(
+    "search_cache_lookups_total",
+    "Result cache lookups by outcome (hit, stale, miss).",
+    ["result"],
+)
+SHOP_FETCH_LATENCY = Histogram(
+    "shop_fetch_duration_seconds",
+    "Latency of a single shop page request.",
+    ["shop"],
+)
+SHOP_ERRORS = Counter(
+    "shop_errors_total",
+    "Failed shop requests by kind (http, exception, deadline).",
+    ["shop", "kind"],
+)
+SHOP_ITEMS = Counter(
+    "shop_items_total",
+    "Offers scraped per shop.",
+    ["shop"],
+)
+SHOP_MATCHES = Counter(
+    "shop_matches_total",
+    "Live searches per shop by whether any offer matched the query.",
+    ["shop", "result"],
+)
+
+
+class _StatsCollector:
+    def collect(self):
+        stats = parse_cache_stats()
+        hits = CounterMetricFamily("parse_text_cache_hits", "parse_text memo hits.")
+        hits.add_metric([], stats["hits"])
+        misses = CounterMetricFamily("parse_text_cache_misses", "parse_text memo misses.")
+        misses.add_metric([], stats["misses"])
+        size = GaugeMetricFamily("parse_text_cache_size", "Entries in the parse_text memo.")
+        size.add_metric([], stats["size"])
+
+        pages = PAGES.stats()
+        outcomes = CounterMetricFamily("page_store_pages", "Shop pages by revalidation outcome.", labels=["outcome"])
+        for outcome in ("not_modified", "unchanged", "parsed"):
+            outcomes.add_metric([outcome], pages[outcome])
+
+        return [hits, misses, size, outcomes]
+
+
+REGISTRY.register(_StatsCollector())
+
+
+async def observe_request(request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    REQUEST_LATENCY.labels(route, request.method).observe(time.perf_counter() - started)
+    return response
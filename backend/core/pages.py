@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from typing import Any, NamedTuple
+
+from cachetools import LRUCache
+
+from core.config import PAGE_CACHE_SIZE
+
+
+class PageEntry(NamedTuple):
+    etag: str | None
+    last_modified: str | None
+    digest: bytes
+    rows: Any
+
+
+def digest(content: bytes) -> bytes:
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+class PageStore:
+    def __init__(self, maxsize: int = PAGE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: LRUCache | None = LRUCache(maxsize=maxsize) if maxsize > 0 else None
+        self._lock = threading.Lock()
+        self.not_modified = 0
+        self.unchanged = 0
+        self.parsed = 0
+
+    def get(self, key: tuple) -> PageEntry | None:
+        if self._entries is None:
+            return None
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: tuple, entry: PageEntry) -> None:
+        if self._entries is None:
+            return
+        with self._lock:
+            self._entries[key] = entry
+
+    def clear(self) -> None:
+        if self._entries is None:
+            return
+        with self._lock:
+            self._entries.clear()
+
+    def mark(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    @staticmethod
+    def conditional_headers(entry: PageEntry | None) -> dict[str, str]:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries) if self._entries is not None else 0,
+            "maxsize": self.maxsize,
+            "not_modified": self.not_modified,
+            "unchanged": self.unchanged,
+            "parsed": self.parsed,
+        }
+
+
+PAGES = PageStore()
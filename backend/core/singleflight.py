@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+        self._tasks: dict[str, asyncio.Future] = {}
+
+    def running(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls or key in self._tasks
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def astart(self, key: str, fn: Callable[[], Awaitable[Any]]) -> tuple[asyncio.Future, bool]:
+        task = self._tasks.get(key)
+        if task is not None:
+            return task, False
+
+        task = asyncio.ensure_future(fn())
+        self._tasks[key] = task
+        task.add_done_callback(lambda t: self._adone(key, t))
+        return task, True
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task, _ = self.astart(key, fn)
+        return await asyncio.shield(task)
+
+    def _adone(self, key: str, task: asyncio.Future) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()
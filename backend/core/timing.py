@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+from core.config import SERVER_TIMING
+
+
+class Timings:
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def as_dict(self) -> dict[str, float]:
+        with self._lock:
+            return {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()}
+
+    def header(self) -> str:
+        return ", ".join(f"{name};dur={ms}" for name, ms in self.as_dict().items())
+
+
+class _Stage:
+    __slots__ = ("timings", "name", "started")
+
+    def __init__(self, timings: Timings, name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.timings.add(self.name, time.perf_counter() - self.started)
+        return False
+
+
+_CURRENT: ContextVar[Timings | None] = ContextVar("timings", default=None)
+_NULL = nullcontext()
+
+
+def start(force: bool = False) -> Timings | None:
+    if not (SERVER_TIMING or force):
+        return None
+    timings = Timings()
+    _CURRENT.set(timings)
+    return timings
+
+
+def current() -> Timings | None:
+    return _CURRENT.get()
+
+
+def stage(name: str):
+    timings = _CURRENT.get()
+    if timings is None:
+        return _NULL
+    return _Stage(timings, name)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from core.config import PARSE_WORKERS
+
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def create_parse_pool(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def get_parse_pool() -> ProcessPoolExecutor | None:
+    global _POOL
+    if PARSE_WORKERS <= 0:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = create_parse_pool(PARSE_WORKERS)
+        return _POOL
+
+
+def discard_parse_pool(pool: ProcessPoolExecutor) -> None:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    print("Parse pool is broken, starting a new one", flush=True)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _ready(_=None) -> bool:
+    import parsers.base  # noqa: F401
+
+    return True
+
+
+def warm_parse_pool() -> None:
+    pool = get_parse_pool()
+    if pool is not None:
+        list(pool.map(_ready, range(PARSE_WORKERS)))
+
+
+def shutdown_parse_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -2,9 +2,9 @@ from __future__ import annotations
 
 import re
 from functools import lru_cache
-from typing import List
+from typing import Iterable
 
-from matching.stopwords import STOP_WORDS
+from matching.stopwords import CATEGORY_STOP_WORDS, STOP_WORDS
 
 
 def _normalize_text(text: str) -> str:
@@ -12,16 +12,40 @@ def _normalize_text(text: str) -> str:
     return text.replace("ё", "е")
 
 
-@lru_cache(maxsize=1)
-def _compiled_patterns() -> List[re.Pattern]:
-    patterns: List[re.Pattern] = []
-    for w in STOP_WORDS:
-        w_n = _normalize_text(w)
-        patterns.append(re.compile(rf"\b{re.escape(w_n)}\b"))
-    return patterns
+def _trie_pattern(words: Iterable[str]) -> str:
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        alternatives = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ""
+        body = "|".join(alternatives)
+        if len(alternatives) > 1 or "" in node:
+            body = f"(?:{body})"
+        if "" in node:
+            body += "?"
+        return body
+
+    return build(trie)
+
+
+@lru_cache(maxsize=None)
+def _compiled_pattern(category: str | None) -> re.Pattern | None:
+    words = {_normalize_text(w) for w in STOP_WORDS}
+    words.update(_normalize_text(w) for w in CATEGORY_STOP_WORDS.get(category or "", ()))
+    words.discard("")
+    if not words:
+        return None
+    return re.compile(rf"\b(?:{_trie_pattern(words)})\b")
 
 
 def contains_stopwords(text: str, category: str | None = None) -> bool:
-    _ = category
-    text_n = _normalize_text(text)
-    return any(p.search(text_n) for p in _compiled_patterns())
\ No newline at end of file
+    pattern = _compiled_pattern(category)
+    if pattern is None:
+        return False
+    return pattern.search(_normalize_text(text)) is not None
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import heapq
 import re
 from typing import Any, Mapping
 
@@ -17,16 +18,6 @@ def _s(v: Any) -> str | None:
     return str(v).strip().lower()
 
 
-def _norm_line(category: str | None, line: Any) -> str | None:
-    if category == "iphone":
-        return _s(line) or "base"
-    return _s(line)
-
-
-def _eq(a: Any, b: Any) -> bool:
-    return _s(a) == _s(b)
-
-
 _PRICE_INT_RE = re.compile(r"\d+")
 
 
@@ -45,190 +36,166 @@ def _price_int(value: Any) -> int | None:
     return None
 
 
-def _required_match(query: Mapping[str, Any], attrs: Mapping[str, Any]) -> bool:
-    qc = _s(query.get("category"))
-    ac = _s(attrs.get("category"))
-    if qc is not None and qc != ac:
-        return False
+_REQUIRED = {
+    "iphone": ("model", "storage", "ram", "line", "color"),
+    "macbook": ("line", "size", "chip", "storage", "ram", "color"),
+    "ipad": ("line", "size", "storage", "ram", "chip", "color"),
+    "airpods": ("line", "model", "color"),
+}
 
-    cat = qc or ac
-    if cat is None:
-        return False
+_WEIGHTS = {
+    "iphone": (("model", 5), ("storage", 5), ("line", 3), ("color", 1)),
+    "macbook": (("chip", 5), ("line", 4), ("storage", 4), ("size", 3), ("color", 1)),
+    "ipad": (("line", 4), ("storage", 4), ("size", 3), ("chip", 2), ("color", 1)),
+    "airpods": (("line", 5), ("model", 3), ("color", 1)),
+}
 
-    if cat == "iphone":
-        if query.get("model") is not None and not _eq(query.get("model"), attrs.get("model")):
-            return False
-        if query.get("storage") is not None and not _eq(query.get("storage"), attrs.get("storage")):
-            return False
-        if query.get("ram") is not None and not _eq(query.get("ram"), attrs.get("ram")):
-            return False
-        if query.get("ram") is not None and not _eq(query.get("ram"), attrs.get("ram")):
-            return False
-        ql = _norm_line(cat, query.get("line"))
-        il = _norm_line(cat, attrs.get("line"))
-        if ql is not None and not _eq(ql, il):
-            return False
-        if query.get("color") is not None and not _eq(query.get("color"), attrs.get("color")):
-            return False
-        return True
+_DEFAULTS = {
+    ("iphone", "line"): "base",
+}
 
-    if cat == "macbook":
-        if query.get("line") is not None and not _eq(query.get("line"), attrs.get("line")):
-            return False
-        if query.get("size") is not None and not _eq(query.get("size"), attrs.get("size")):
-            return False
-        if query.get("chip") is not None and not _eq(query.get("chip"), attrs.get("chip")):
-            return False
-        if query.get("storage") is not None and not _eq(query.get("storage"), attrs.get("storage")):
-            return False
-        if query.get("ram") is not None and not _eq(query.get("ram"), attrs.get("ram")):
-            return False
-        if query.get("ram") is not None and not _eq(query.get("ram"), attrs.get("ram")):
-            return False
-        if query.get("color") is not None and not _eq(query.get("color"), attrs.get("color")):
-            return False
-        return True
 
-    if cat == "ipad":
-        if query.get("line") is not None and not _eq(query.get("line"), attrs.get("line")):
-            return False
-        if query.get("size") is not None and not _eq(query.get("size"), attrs.get("size")):
-            return False
-        if query.get("storage") is not None and not _eq(query.get("storage"), attrs.get("storage")):
-            return False
-        if query.get("ram") is not None and not _eq(query.get("ram"), attrs.get("ram")):
-            return False
-        if query.get("ram") is not None and not _eq(query.get("ram"), attrs.get("ram")):
-            return False
-        if query.get("chip") is not None and not _eq(query.get("chip"), attrs.get("chip")):
-            return False
-        if query.get("color") is not None and not _eq(query.get("color"), attrs.get("color")):
-            return False
+def _attr_eq(attrs: Mapping[str, Any], key: str, value: str, default: str | None) -> bool:
+    a = attrs.get(key)
+    if a == value:
         return True
+    if a is None:
+        return default == value
+    return (_s(a) or default) == value
+
+
+class _Branch:
+    __slots__ = ("required", "base_score", "weights", "model_bonus")
+
+    def __init__(self, category: str, query: Mapping[str, Any]):
+        def norm(key: str) -> tuple[str | None, str | None]:
+            value = _s(query.get(key))
+            default = _DEFAULTS.get((category, key))
+            if default is not None:
+                value = value or default
+            return value, default
+
+        required = []
+        for key in _REQUIRED[category]:
+            value, default = norm(key)
+            if value is not None:
+                required.append((key, value, default))
+
+        base_score = 0
+        weights = []
+        for key, weight in _WEIGHTS[category]:
+            value, default = norm(key)
+            if value is None:
+                continue
+            if key in _REQUIRED[category]:
+                base_score += weight
+            else:
+                weights.append((key, value, default, weight))
+
+        self.required = tuple(required)
+        self.base_score = base_score
+        self.weights = tuple(weights)
+        self.model_bonus = category == "airpods" and query.get("model") is None
+
+    def rank(self, attrs: Mapping[str, Any]) -> int | None:
+        for key, value, default in self.required:
+            if not _attr_eq(attrs, key, value, default):
+                return None
+
+        s = self.base_score
+        for key, value, default, weight in self.weights:
+            if _attr_eq(attrs, key, value, default):
+                s += weight
+        if self.model_bonus and attrs.get("model") is None:
+            s += 1
+        return s
 
-    if cat == "airpods":
-        ql = _norm_line(cat, query.get("line"))
-        il = _norm_line(cat, attrs.get("line"))
-        if ql is not None and not _eq(ql, il):
-            return False
-        if query.get("model") is not None and not _eq(query.get("model"), attrs.get("model")):
-            return False
-        if query.get("color") is not None and not _eq(query.get("color"), attrs.get("color")):
-            return False
-        return True
 
-    return False
+class QueryMatcher:
+    __slots__ = ("category", "branches")
 
+    def __init__(self, query_attrs: Mapping[str, Any]):
+        self.category = _s(query_attrs.get("category"))
+        categories = (self.category,) if self.category is not None else tuple(_REQUIRED)
+        self.branches = {cat: _Branch(cat, query_attrs) for cat in categories if cat in _REQUIRED}
 
-def _score(query: Mapping[str, Any], attrs: Mapping[str, Any]) -> int:
-    cat = _s(query.get("category")) or _s(attrs.get("category"))
-    if not cat:
-        return 0
+    def rank(self, attrs: Mapping[str, Any]) -> int | None:
+        ac = attrs.get("category")
+        if self.category is None or ac != self.category:
+            ac = _s(ac)
+        if self.category is not None and ac != self.category:
+            return None
 
-    s = 0
+        branch = self.branches.get(ac)
+        if branch is None:
+            return None
+        return branch.rank(attrs)
 
-    if cat == "iphone":
-        if query.get("model") is not None and _eq(query.get("model"), attrs.get("model")):
-            s += 5
-        if query.get("storage") is not None and _eq(query.get("storage"), attrs.get("storage")):
-            s += 5
-        ql = _norm_line(cat, query.get("line"))
-        il = _norm_line(cat, attrs.get("line"))
-        if ql is not None and _eq(ql, il):
-            s += 3
-        if query.get("color") is not None and _eq(query.get("color"), attrs.get("color")):
-            s += 1
-        return s
 
-    if cat == "macbook":
-        if query.get("chip") is not None and _eq(query.get("chip"), attrs.get("chip")):
-            s += 5
-        if query.get("line") is not None and _eq(query.get("line"), attrs.get("line")):
-            s += 4
-        if query.get("storage") is not None and _eq(query.get("storage"), attrs.get("storage")):
-            s += 4
-        if query.get("size") is not None and _eq(query.get("size"), attrs.get("size")):
-            s += 3
-        if query.get("color") is not None and _eq(query.get("color"), attrs.get("color")):
-            s += 1
-        return s
+def _specificity(attrs: Mapping[str, Any]) -> int:
+    return sum(1 for k in ("model", "line", "storage", "size", "chip", "color") if attrs.get(k) is not None)
 
-    if cat == "ipad":
-        if query.get("line") is not None and _eq(query.get("line"), attrs.get("line")):
-            s += 4
-        if query.get("storage") is not None and _eq(query.get("storage"), attrs.get("storage")):
-            s += 4
-        if query.get("size") is not None and _eq(query.get("size"), attrs.get("size")):
-            s += 3
-        if query.get("chip") is not None and _eq(query.get("chip"), attrs.get("chip")):
-            s += 2
-        if query.get("color") is not None and _eq(query.get("color"), attrs.get("color")):
-            s += 1
-        return s
 
-    if cat == "airpods":
-        ql = _norm_line(cat, query.get("line"))
-        il = _norm_line(cat, attrs.get("line"))
-        if ql is not None and _eq(ql, il):
-            s += 5
-        if query.get("model") is not None and _eq(query.get("model"), attrs.get("model")):
-            s += 3
-        if query.get("model") is None and attrs.get("model") is None:
-            s += 1
-        if query.get("color") is not None and _eq(query.get("color"), attrs.get("color")):
-            s += 1
-        return s
+def perfect_match(query_attrs: Mapping[str, Any]):
+    matcher = QueryMatcher(query_attrs)
+    q_category = matcher.category
+    top_score = matcher.rank(query_attrs) or 0
 
-    return 0
+    def check(item: dict) -> bool:
+        title = _get_title(item)
+        if title and contains_stopwords(title, category=q_category):
+            return False
+
+        attrs = item.get("_attrs")
+        if not isinstance(attrs, Mapping):
+            attrs = parse_text(title)
 
+        score = matcher.rank(attrs)
+        if score is None:
+            return False
+        if _price_int(item.get("price")) is None:
+            return False
+        return score >= top_score
 
-def _specificity(attrs: Mapping[str, Any]) -> int:
-    return sum(1 for k in ("model", "line", "storage", "size", "chip", "color") if attrs.get(k) is not None)
+    return check
 
 
-def pick_best(items: list[dict], query_attrs: dict) -> dict | None:
-    q_category = _s(query_attrs.get("category"))
+def pick_top(items: list[dict], query_attrs: Mapping[str, Any], k: int = 1) -> list[dict]:
+    if k < 1:
+        return []
 
-    best_item: dict | None = None
-    best_score = -1
-    best_price: int | None = None
-    best_spec = -1
+    matcher = QueryMatcher(query_attrs)
+    q_category = matcher.category
+    heap: list[tuple[int, int, int, int, dict]] = []
 
-    for item in items:
+    for index, item in enumerate(items):
         title = _get_title(item)
         if title and contains_stopwords(title, category=q_category):
             continue
 
         attrs = item.get("_attrs")
-        if not isinstance(attrs, dict):
+        if not isinstance(attrs, Mapping):
             attrs = parse_text(title)
             item["_attrs"] = attrs
 
-        if not _required_match(query_attrs, attrs):
+        score = matcher.rank(attrs)
+        if score is None:
             continue
 
         price = _price_int(item.get("price"))
         if price is None:
             continue
 
-        score = _score(query_attrs, attrs)
-        spec = _specificity(attrs)
+        entry = (score, -price, _specificity(attrs), -index, item)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:4] > heap[0][:4]:
+            heapq.heapreplace(heap, entry)
 
-        if score > best_score:
-            best_item = item
-            best_score = score
-            best_price = price
-            best_spec = spec
-            continue
+    heap.sort(reverse=True)
+    return [entry[4] for entry in heap]
 
-        if score == best_score:
-            if best_price is None or price < best_price:
-                best_item = item
-                best_price = price
-                best_spec = spec
-                continue
-            if best_price is not None and price == best_price and spec > best_spec:
-                best_item = item
-                best_spec = spec
 
-    return best_item
\ No newline at end of file
+def pick_best(items: list[dict], query_attrs: Mapping[str, Any]) -> dict | None:
+    top = pick_top(items, query_attrs, 1)
+    return top[0] if top else None
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import re
-from typing import Any, Dict
+from collections import deque
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
 
 from matching.dictionaries import COLORS, STORAGE
 
@@ -11,39 +14,94 @@ def _normalize_text(text: str) -> str:
     return text.replace("ё", "е")
 
 
-def _extract_color(text: str) -> str | None:
-    for key, values in COLORS.items():
-        if any(v in text for v in values):
-            return key
-    return None
+def _min_rank(a: int | None, b: int | None) -> int | None:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+
+def _build_automaton(tables: list[dict[str, list[str]]]):
+    goto: list[dict[str, int]] = [{}]
+    ranks: list[list[int | None]] = [[None] * len(tables)]
+
+    for index, table in enumerate(tables):
+        for rank, values in enumerate(table.values()):
+            for value in values:
+                state = 0
+                for ch in value:
+                    nxt = goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto.append({})
+                        ranks.append([None] * len(tables))
+                        goto[state][ch] = nxt
+                    state = nxt
+                ranks[state][index] = _min_rank(ranks[state][index], rank)
+
+    fail = [0] * len(goto)
+    delta: list[dict[str, int]] = [goto[0]] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        back = fail[state]
+        ranks[state] = [_min_rank(a, b) for a, b in zip(ranks[state], ranks[back])]
+        delta[state] = {**delta[back], **goto[state]}
+        for ch, nxt in goto[state].items():
+            fail[nxt] = delta[back].get(ch, 0)
+            queue.append(nxt)
+
+    outputs = [tuple(r) if any(x is not None for x in r) else None for r in ranks]
+    return delta, outputs
+
+
+_TERM_TABLES = [STORAGE, COLORS]
+_TERM_KEYS = [list(table) for table in _TERM_TABLES]
+_TERM_DELTA, _TERM_OUTPUTS = _build_automaton(_TERM_TABLES)
+
+
+def _scan_terms(text: str) -> tuple[str | None, str | None]:
+    delta = _TERM_DELTA
+    outputs = _TERM_OUTPUTS
+    state = 0
+    storage = color = None
+
+    for ch in text:
+        state = delta[state].get(ch, 0)
+        found = outputs[state]
+        if found is not None:
+            s, c = found
+            if s is not None and (storage is None or s < storage):
+                storage = s
+            if c is not None and (color is None or c < color):
+                color = c
+
+    return (
+        _TERM_KEYS[0][storage] if storage is not None else None,
+        _TERM_KEYS[1][color] if color is not None else None,
+    )
 
 
-_IPHONE_RE = re.compile(r"\biphone\b", re.IGNORECASE)
 _IPHONE_MODELS = [str(i) for i in range(17, 12, -1)]
 _IPHONE_MODEL_RE = re.compile(r"\b(" + "|".join(_IPHONE_MODELS) + r")\b")
 
-_IPHONE_LINE_PRO_MAX_RE = re.compile(r"\bpro\s*max\b", re.IGNORECASE)
-_IPHONE_LINE_PRO_RE = re.compile(r"\bpro\b", re.IGNORECASE)
-_IPHONE_LINE_PLUS_RE = re.compile(r"\bplus\b", re.IGNORECASE)
-_IPHONE_LINE_MINI_RE = re.compile(r"\bmini\b", re.IGNORECASE)
+_IPHONE_LINE_RE = re.compile(r"\b(?:(pro\s*max)|(pro)|(plus)|(mini))\b", re.IGNORECASE)
+_IPHONE_LINES = (None, "pro max", "pro", "plus", "mini")
 
 
-_MACBOOK_RE = re.compile(r"\bmacbook\b", re.IGNORECASE)
 _MACBOOK_CHIP_RE = re.compile(r"\bm[1-5]\b", re.IGNORECASE)
-_MACBOOK_LINE_PRO_RE = re.compile(r"\bpro\b", re.IGNORECASE)
-_MACBOOK_LINE_AIR_RE = re.compile(r"\bair\b", re.IGNORECASE)
+_MACBOOK_LINE_RE = re.compile(r"\b(?:(pro)|(air))\b", re.IGNORECASE)
+_MACBOOK_LINES = (None, "pro", "air")
 
 
-_IPAD_RE = re.compile(r"\bipad\b", re.IGNORECASE)
-_IPAD_LINE_PRO_RE = re.compile(r"\bipad\s*pro\b", re.IGNORECASE)
-_IPAD_LINE_AIR_RE = re.compile(r"\bipad\s*air\b", re.IGNORECASE)
-_IPAD_LINE_MINI_RE = re.compile(r"\bipad\s*mini\b", re.IGNORECASE)
+_IPAD_LINE_RE = re.compile(r"\bipad\s*(?:(pro)|(air)|(mini))\b", re.IGNORECASE)
+_IPAD_LINES = ("ipad", "pro", "air", "mini")
 _IPAD_CHIP_RE = re.compile(r"\bm[1-5]\b", re.IGNORECASE)
 
 
-_AIRPODS_RE = re.compile(r"\bair\s*pods\b", re.IGNORECASE)
-_AIRPODS_MAX_RE = re.compile(r"\bair\s*pods\s*max\b", re.IGNORECASE)
-_AIRPODS_PRO_RE = re.compile(r"\bair\s*pods\s*pro\b", re.IGNORECASE)
+_AIRPODS_LINE_RE = re.compile(r"\bair\s*pods\s*(?:(max)|(pro))\b", re.IGNORECASE)
+_AIRPODS_LINES = ("airpods", "max", "pro")
 
 _AIRPODS_PRO_MODEL_RE = re.compile(r"\bpro\s*([23])\b", re.IGNORECASE)
 _AIRPODS_ORDINAL_EN_RE = re.compile(r"\b([23])\s*(?:nd|rd|th)\b", re.IGNORECASE)
@@ -56,21 +114,28 @@ _RAM_RE = re.compile(r"\b(8|16|24|36|48)\s*gb\b", re.IGNORECASE)
 
 
 _NUMBER_TOKEN_RE = re.compile(r"\b(\d{1,2}(?:[\.,]\d+)?)\b")
+_UNIT_TAIL_RE = re.compile(r"\s*(gb|гб|tb|тб)\b", re.IGNORECASE)
 
 _MACBOOK_SIZES = {13, 14, 15, 16}
 _IPAD_SIZES = set(range(7, 14))
 
 
+_CATEGORY_RE = re.compile(r"\b(?:(ipad)|(iphone)|(macbook)|(air\s*pods))\b", re.IGNORECASE)
+_CATEGORIES = (None, "ipad", "iphone", "macbook", "airpods")
+
+
+def _ranked(rx: re.Pattern, text: str) -> int:
+    best = 0
+    for m in rx.finditer(text):
+        if not best or m.lastindex < best:
+            best = m.lastindex
+            if best == 1:
+                break
+    return best
+
+
 def _detect_category(text: str) -> str | None:
-    if _IPAD_RE.search(text):
-        return "ipad"
-    if _IPHONE_RE.search(text):
-        return "iphone"
-    if _MACBOOK_RE.search(text):
-        return "macbook"
-    if _AIRPODS_RE.search(text):
-        return "airpods"
-    return None
+    return _CATEGORIES[_ranked(_CATEGORY_RE, text)]
 
 
 def _extract_ram(text: str) -> str | None:
@@ -89,7 +154,7 @@ def _extract_size_as_int(text: str, allowed: set[int]) -> str | None:
 
         tail = text[end : end + 8].lower()
 
-        if re.match(r"\s*(gb|гб|tb|тб)\b", tail, flags=re.IGNORECASE):
+        if _UNIT_TAIL_RE.match(tail):
             continue
 
         if tail and tail[0].isalpha():
@@ -107,9 +172,37 @@ def _extract_size_as_int(text: str, allowed: set[int]) -> str | None:
     return None
 
 
-def parse_text(text: str) -> Dict[str, Any]:
-    text = _normalize_text(text)
+PARSE_CACHE_SIZE = 16384
+
+ATTR_KEYS = ("category", "model", "line", "storage", "ram", "color", "size", "chip")
+
+
+def parse_text(text: str) -> Mapping[str, Any]:
+    return _parse_normalized(_normalize_text(text))
 
+
+def pack_attrs(attrs: Mapping[str, Any]) -> tuple:
+    return tuple(attrs.get(key) for key in ATTR_KEYS)
+
+
+def unpack_attrs(values: tuple) -> Mapping[str, Any]:
+    return MappingProxyType(dict(zip(ATTR_KEYS, values)))
+
+
+def parse_cache_stats() -> Dict[str, Any]:
+    info = _parse_normalized.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hit_ratio": info.hits / lookups if lookups else 0.0,
+    }
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_normalized(text: str) -> Mapping[str, Any]:
     result: Dict[str, Any] = {
         "category": None,
         "model": None,
@@ -131,20 +224,10 @@ def parse_text(text: str) -> Dict[str, Any]:
         if m:
             result["model"] = m.group(1)
 
-        if _IPHONE_LINE_PRO_MAX_RE.search(text):
-            result["line"] = "pro max"
-        elif _IPHONE_LINE_PRO_RE.search(text):
-            result["line"] = "pro"
-        elif _IPHONE_LINE_PLUS_RE.search(text):
-            result["line"] = "plus"
-        elif _IPHONE_LINE_MINI_RE.search(text):
-            result["line"] = "mini"
+        result["line"] = _IPHONE_LINES[_ranked(_IPHONE_LINE_RE, text)]
 
     elif category == "macbook":
-        if _MACBOOK_LINE_PRO_RE.search(text):
-            result["line"] = "pro"
-        elif _MACBOOK_LINE_AIR_RE.search(text):
-            result["line"] = "air"
+        result["line"] = _MACBOOK_LINES[_ranked(_MACBOOK_LINE_RE, text)]
 
         cm = _MACBOOK_CHIP_RE.search(text)
         if cm:
@@ -155,14 +238,7 @@ def parse_text(text: str) -> Dict[str, Any]:
         result["size"] = _extract_size_as_int(text, _MACBOOK_SIZES)
 
     elif category == "ipad":
-        if _IPAD_LINE_PRO_RE.search(text):
-            result["line"] = "pro"
-        elif _IPAD_LINE_AIR_RE.search(text):
-            result["line"] = "air"
-        elif _IPAD_LINE_MINI_RE.search(text):
-            result["line"] = "mini"
-        else:
-            result["line"] = "ipad"
+        result["line"] = _IPAD_LINES[_ranked(_IPAD_LINE_RE, text)]
 
         result["size"] = _extract_size_as_int(text, _IPAD_SIZES)
 
@@ -171,12 +247,7 @@ def parse_text(text: str) -> Dict[str, Any]:
             result["chip"] = cm.group(0).lower()
 
     elif category == "airpods":
-        if _AIRPODS_MAX_RE.search(text):
-            result["line"] = "max"
-        elif _AIRPODS_PRO_RE.search(text):
-            result["line"] = "pro"
-        else:
-            result["line"] = "airpods"
+        result["line"] = _AIRPODS_LINES[_ranked(_AIRPODS_LINE_RE, text)]
 
         if result["line"] == "pro":
             for rx in (
@@ -194,11 +265,6 @@ def parse_text(text: str) -> Dict[str, Any]:
             if gm:
                 result["model"] = gm.group(1) or gm.group(2)
 
-    for key, values in STORAGE.items():
-        if any(v in text for v in values):
-            result["storage"] = key
-            break
-
-    result["color"] = _extract_color(text)
+    result["storage"], result["color"] = _scan_terms(text)
 
-    return result
+    return MappingProxyType(result)
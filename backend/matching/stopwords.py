@@ -8,6 +8,13 @@ STOP_WORDS = [
     "футляр",
     "кейс",
     "case",
-    "box",
     "шнур"
 ]
+
+CATEGORY_STOP_WORDS = {
+    "airpods": [
+        "box",
+        "амбушюры",
+        "ear tips",
+    ],
+}
@@ -1,74 +1,72 @@
 # parsers/applegod.py
 
 from bs4 import BeautifulSoup
-from matching.parser import parse_text
-from core.http import create_session
+from lxml import etree
 
+from parsers.base import Rows, ShopParser, first, has_class, parse_html, stripped_text
 
-class AppleGodParser:
-    base_url = "https://applegod.ru/search/"
 
-    def __init__(self, session=None):
-        self.session = session or create_session()
+_CARDS = etree.XPath(f"//div[{has_class('products__card', 'card-product')}]")
+_TITLE = etree.XPath(f".//*[{has_class('card-product__title')}]//a[@href]")
+_PRICE = etree.XPath(".//meta[@itemprop='price']")
 
-    def search(self, query: str, limit: int = 20):
-        results = []
-        page = 1
-        seen = set()
 
-        headers = {
-            "User-Agent": "Mozilla/5.0"
+class AppleGodParser(ShopParser):
+    shop = "AppleGod"
+    base_url = "https://applegod.ru/search/"
+    headers = {
+        "User-Agent": "Mozilla/5.0"
+    }
+    timeout = 10
+
+    def params(self, query: str, page: int):
+        return {
+            "q": query,
+            "PAGEN_4": page,
         }
 
-        while len(results) < limit and page <= 2:
-            params = {
-                "q": query,
-                "PAGEN_4": page,
-            }
-
-            response = self.session.get(
-                self.base_url,
-                params=params,
-                headers=headers,
-                timeout=10
-            )
+    @staticmethod
+    def parse_page_lxml(html: str):
+        root = parse_html(html)
+        cards = _CARDS(root) if root is not None else []
+        if not cards:
+            return None
 
-            if response.status_code != 200:
-                break
+        rows = Rows(cards=len(cards))
+        for card in cards:
+            title_a = first(_TITLE, card)
+            price_meta = first(_PRICE, card)
 
-            soup = BeautifulSoup(response.text, "lxml")
-            cards = soup.select("div.products__card.card-product")
-            if not cards:
-                break
+            if title_a is None or price_meta is None:
+                continue
 
-            for card in cards:
-                if len(results) >= limit:
-                    break
+            title = stripped_text(title_a)
+            url = "https://applegod.ru" + title_a.get("href")
+            price = int(float(price_meta.get("content")))
 
-                title_a = card.select_one(".card-product__title a[href]")
-                price_meta = card.select_one('meta[itemprop="price"]')
+            rows.append((title, url, price))
 
-                if not title_a or not price_meta:
-                    continue
+        return rows
 
-                title = title_a.get_text(strip=True)
-                url = "https://applegod.ru" + title_a["href"]
+    @staticmethod
+    def parse_page_soup(html: str):
+        soup = BeautifulSoup(html, "lxml")
+        cards = soup.select("div.products__card.card-product")
+        if not cards:
+            return None
 
-                if url in seen:
-                    continue
-                seen.add(url)
+        rows = Rows(cards=len(cards))
+        for card in cards:
+            title_a = card.select_one(".card-product__title a[href]")
+            price_meta = card.select_one('meta[itemprop="price"]')
 
-                price = int(float(price_meta["content"]))
-                attrs = parse_text(title)
+            if not title_a or not price_meta:
+                continue
 
-                results.append({
-                    "shop": "AppleGod",
-                    "title": title,
-                    "price": price,
-                    "url": url,
-                    "_attrs": attrs,
-                })
+            title = title_a.get_text(strip=True)
+            url = "https://applegod.ru" + title_a["href"]
+            price = int(float(price_meta["content"]))
 
-            page += 1
+            rows.append((title, url, price))
 
-        return results
\ No newline at end of file
+        return rows
@@ -1,77 +1,72 @@
 from bs4 import BeautifulSoup
+from lxml import etree
 
-from matching.parser import parse_text
-from core.http import create_session
+from parsers.base import Rows, ShopParser, digits, first, has_class, parse_html, stripped_text
 
-class AppleMarketParser:
-    base_url = "https://apple-market.ru/index.php"
 
-    def __init__(self, session=None):
-        self.session = session or create_session()
+_CARDS = etree.XPath(f"//li[{has_class('search-page__results-item')}]//article[{has_class('product')}]")
+_TITLE = etree.XPath(f".//h3[{has_class('product__name')}]//a[@href]")
+_PRICE = etree.XPath(f".//div[{has_class('product__prices')}]//span[{has_class('product__price')}]")
 
-    def search(self, query: str, limit: int = 20):
-        results = []
-        page = 1
-        seen = set()
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
-        }
+class AppleMarketParser(ShopParser):
+    shop = "AppleMarket"
+    base_url = "https://apple-market.ru/index.php"
+    verify = False
 
-        while len(results) < limit and page <= 2:
-            params = {
-                "route": "product/search",
-                "search": query,
-                "page": page,
-            }
-
-            response = self.session.get(
-                self.base_url,
-                params=params,
-                headers=headers,
-                timeout=15,
-                verify=False,
-            )
-
-            if response.status_code != 200:
-                print(f"AppleMarket HTTP {response.status_code}", flush=True)
-                break
-
-            soup = BeautifulSoup(response.text, "lxml")
-            cards = soup.select("li.search-page__results-item article.product")
-            if not cards:
-                break
-
-            for card in cards:
-                if len(results) >= limit:
-                    break
-
-                title_a = card.select_one("h3.product__name a[href]")
-                if not title_a:
-                    continue
-
-                title = title_a.get_text(strip=True)
-                url = title_a["href"]
-
-                if url in seen:
-                    continue
-                seen.add(url)
-
-                price_span = card.select_one("div.product__prices span.product__price")
-                if not price_span:
-                    continue
+    def params(self, query: str, page: int):
+        return {
+            "route": "product/search",
+            "search": query,
+            "page": page,
+        }
 
+    @staticmethod
+    def parse_page_lxml(html: str):
+        root = parse_html(html)
+        cards = _CARDS(root) if root is not None else []
+        if not cards:
+            return None
+
+        rows = Rows(cards=len(cards))
+        for card in cards:
+            title_a = first(_TITLE, card)
+            if title_a is None:
+                continue
+
+            title = stripped_text(title_a)
+            url = title_a.get("href")
+
+            price = None
+            price_span = first(_PRICE, card)
+            if price_span is not None:
+                price = digits(price_span.xpath("string()"))
+
+            rows.append((title, url, price))
+
+        return rows
+
+    @staticmethod
+    def parse_page_soup(html: str):
+        soup = BeautifulSoup(html, "lxml")
+        cards = soup.select("li.search-page__results-item article.product")
+        if not cards:
+            return None
+
+        rows = Rows(cards=len(cards))
+        for card in cards:
+            title_a = card.select_one("h3.product__name a[href]")
+            if not title_a:
+                continue
+
+            title = title_a.get_text(strip=True)
+            url = title_a["href"]
+
+            price = None
+            price_span = card.select_one("div.product__prices span.product__price")
+            if price_span:
                 price = int("".join(ch for ch in price_span.get_text() if ch.isdigit()))
-                attrs = parse_text(title)
-
-                results.append({
-                    "shop": "AppleMarket",
-                    "title": title,
-                    "price": price,
-                    "url": url,
-                    "_attrs": attrs,
-                })
 
-            page += 1
+            rows.append((title, url, price))
 
-        return results
\ No newline at end of file
+        return rows
@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+import httpx
+import requests
+from lxml import etree
+
+from core.config import PARSER_BACKEND
+from core.health import HEALTH
+from core.metrics import SHOP_ERRORS, SHOP_FETCH_LATENCY
+from core.http import get_async_client, get_session
+from core.pages import PAGES, PageEntry, digest
+from core.timing import stage
+from core.workers import discard_parse_pool, get_parse_pool
+from matching.parser import pack_attrs, parse_text, unpack_attrs
+
+
+Row = tuple[str, str, int | None]
+Record = tuple[str, str, int | None, Any]
+
+
+class Rows(list):
+    def __init__(self, rows=(), cards: int = 0):
+        super().__init__(rows)
+        self.cards = cards
+
+
+def has_class(*names: str) -> str:
+    return " and ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')" for name in names
+    )
+
+
+def parse_html(html: str):
+    return etree.fromstring(html.encode("utf-8"), etree.HTMLParser(encoding="utf-8"))
+
+
+def first(xpath: etree.XPath, node):
+    found = xpath(node)
+    return found[0] if found else None
+
+
+def stripped_text(node) -> str:
+    return "".join(s.strip() for s in node.xpath(".//text()"))
+
+
+def digits(text: str) -> int:
+    return int("".join(ch for ch in text if ch.isdigit()))
+
+
+def parse_records(parser_cls, html: str) -> Rows | None:
+    rows = parser_cls.parse_page(html)
+    if rows is None:
+        return None
+    return Rows((
+        (title, url, price, pack_attrs(parse_text(title)) if price is not None else None)
+        for title, url, price in rows
+    ), rows.cards)
+
+
+def with_attrs(rows: Rows | None) -> Rows | None:
+    if rows is None:
+        return None
+    return Rows(
+        ((title, url, price, parse_text(title) if price is not None else None) for title, url, price in rows),
+        rows.cards,
+    )
+
+
+def _unpack_records(records: Rows | None) -> Rows | None:
+    if records is None:
+        return None
+    return Rows((
+        (title, url, price, unpack_attrs(attrs) if attrs is not None else None)
+        for title, url, price, attrs in records
+    ), records.cards)
+
+
+class ShopParser:
+    shop = ""
+    base_url = ""
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
+    }
+    timeout = 15
+    verify = True
+    max_pages = 2
+    page_size: int | None = None
+
+    def __init__(self, session=None, client=None):
+        self.session = session or get_session()
+        self.client = client
+
+    def params(self, query: str, page: int) -> dict[str, Any]:
+        raise NotImplementedError
+
+    @classmethod
+    def parse_page(cls, html: str) -> Rows | None:
+        if PARSER_BACKEND == "soup":
+            return cls.parse_page_soup(html)
+        return cls.parse_page_lxml(html)
+
+    @staticmethod
+    def parse_page_lxml(html: str) -> Rows | None:
+        raise NotImplementedError
+
+    @staticmethod
+    def parse_page_soup(html: str) -> Rows | None:
+        raise NotImplementedError
+
+    def search(self, query: str, limit: int = 20, stop=None):
+        results = []
+        page = 1
+        seen = set()
+
+        while len(results) < limit and page <= self.max_pages:
+            rows = self._fetch_page(query, page)
+            if rows is None:
+                break
+
+            if self._collect(rows, results, seen, limit, stop) or self.is_last_page(rows):
+                break
+            page += 1
+
+        return results
+
+    async def asearch(self, query: str, limit: int = 20, stop=None):
+        client = self.client or get_async_client(verify=self.verify)
+        results = []
+        seen = set()
+
+        pages = [
+            asyncio.create_task(self._afetch_page(client, query, page))
+            for page in range(1, self.max_pages + 1)
+        ]
+        try:
+            for task in pages:
+                if len(results) >= limit:
+                    break
+
+                rows = await task
+                if rows is None:
+                    break
+
+                if self._collect(rows, results, seen, limit, stop) or self.is_last_page(rows):
+                    break
+        finally:
+            for task in pages:
+                task.cancel()
+            await asyncio.gather(*pages, return_exceptions=True)
+
+        return results
+
+    async def _afetch_page(self, client, query: str, page: int) -> Rows | None:
+        key = (self.shop, query, page)
+        entry = PAGES.get(key)
+        start = time.perf_counter()
+        try:
+            with stage(f"fetch.{self.shop}"):
+                response = await client.get(
+                    self.base_url,
+                    params=self.params(query, page),
+                    headers={**self.headers, **PAGES.conditional_headers(entry)},
+                    timeout=self.request_timeout(),
+                )
+        except Exception as e:
+            self._record_error(e, time.perf_counter() - start)
+            raise
+
+        if not self._record(response.status_code, time.perf_counter() - start):
+            return None
+
+        reused, value = self._revalidate(key, entry, response)
+        if reused:
+            return value
+        with stage(f"parse.{self.shop}"):
+            rows = await self._aparse(response.text)
+        self._store(key, response, value, rows)
+        return rows
+
+    def _fetch_page(self, query: str, page: int) -> Rows | None:
+        key = (self.shop, query, page)
+        entry = PAGES.get(key)
+        start = time.perf_counter()
+        try:
+            with stage(f"fetch.{self.shop}"):
+                response = self.session.get(
+                    self.base_url,
+                    params=self.params(query, page),
+                    headers={**self.headers, **PAGES.conditional_headers(entry)},
+                    timeout=self.request_timeout(),
+                    verify=self.verify,
+                )
+        except Exception as e:
+            self._record_error(e, time.perf_counter() - start)
+            raise
+
+        if not self._record(response.status_code, time.perf_counter() - start):
+            return None
+
+        reused, value = self._revalidate(key, entry, response)
+        if reused:
+            return value
+        with stage(f"parse.{self.shop}"):
+            rows = self._parse(response.text)
+        self._store(key, response, value, rows)
+        return rows
+
+    def is_last_page(self, rows: Rows) -> bool:
+        cards = getattr(rows, "cards", len(rows))
+        return not cards or (self.page_size is not None and cards < self.page_size)
+
+    def request_timeout(self) -> float:
+        return HEALTH.timeout(self.shop, self.timeout)
+
+    def _record_error(self, error: Exception, elapsed: float) -> None:
+        timed_out = isinstance(error, (httpx.TimeoutException, requests.Timeout))
+        HEALTH.record_failure(self.shop, repr(error), elapsed if timed_out else None)
+        SHOP_ERRORS.labels(self.shop, "exception").inc()
+
+    def _record(self, status_code: int, elapsed: float) -> bool:
+        SHOP_FETCH_LATENCY.labels(self.shop).observe(elapsed)
+        if status_code >= 500 or status_code == 429:
+            HEALTH.record_failure(self.shop, f"HTTP {status_code}", elapsed)
+        else:
+            HEALTH.record_success(self.shop, elapsed)
+
+        if status_code == 304:
+            return True
+        if status_code != 200:
+            print(f"{self.shop} HTTP {status_code}", flush=True)
+            SHOP_ERRORS.labels(self.shop, "http").inc()
+            return False
+        return True
+
+    def _revalidate(self, key: tuple, entry: PageEntry | None, response) -> tuple[bool, Any]:
+        if response.status_code == 304:
+            if entry is None:
+                return True, None
+            PAGES.mark("not_modified")
+            return True, entry.rows
+
+        content_digest = digest(response.content)
+        if entry is not None and entry.digest == content_digest:
+            PAGES.mark("unchanged")
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if (etag, last_modified) != (entry.etag, entry.last_modified):
+                PAGES.set(key, entry._replace(etag=etag, last_modified=last_modified))
+            return True, entry.rows
+
+        return False, content_digest
+
+    def _store(self, key: tuple, response, content_digest: bytes, rows) -> None:
+        PAGES.mark("parsed")
+        PAGES.set(key, PageEntry(
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            content_digest,
+            rows,
+        ))
+
+    def _parse(self, html: str):
+        pool = get_parse_pool()
+        if pool is None:
+            return self.parse_page(html)
+        try:
+            return _unpack_records(pool.submit(parse_records, type(self), html).result())
+        except BrokenProcessPool:
+            discard_parse_pool(pool)
+            return self.parse_page(html)
+
+    async def _aparse(self, html: str):
+        pool = get_parse_pool()
+        if pool is None:
+            return await asyncio.to_thread(self._parse_with_attrs, html)
+        loop = asyncio.get_running_loop()
+        try:
+            return _unpack_records(await loop.run_in_executor(pool, parse_records, type(self), html))
+        except BrokenProcessPool:
+            discard_parse_pool(pool)
+            return await asyncio.to_thread(self._parse_with_attrs, html)
+
+    def _parse_with_attrs(self, html: str) -> Rows | None:
+        return with_attrs(self.parse_page(html))
+
+    def _collect(self, rows: list[Row | Record], results: list[dict], seen: set, limit: int, stop=None) -> bool:
+        with stage(f"collect.{self.shop}"):
+            return self._collect_rows(rows, results, seen, limit, stop)
+
+    def _collect_rows(self, rows: list[Row | Record], results: list[dict], seen: set, limit: int, stop=None) -> bool:
+        found = False
+        for row in rows:
+            title, url, price = row[0], row[1], row[2]
+            if len(results) >= limit:
+                break
+
+            if url in seen:
+                continue
+            seen.add(url)
+
+            if price is None:
+                continue
+
+            item = {
+                "shop": self.shop,
+                "title": title,
+                "price": price,
+                "url": url,
+                "_attrs": row[3] if len(row) > 3 else parse_text(title),
+            }
+            results.append(item)
+
+            if stop is not None and not found:
+                found = stop(item)
+
+        return found
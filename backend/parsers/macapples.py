@@ -1,71 +1,68 @@
 from bs4 import BeautifulSoup
+from lxml import etree
 
-from matching.parser import parse_text
-from core.http import create_session
+from parsers.base import Rows, ShopParser, first, has_class, parse_html, stripped_text
 
 
-class MacApplesParser:
-    base_url = "https://macapples.ru/search"
-
-    def __init__(self, session=None):
-        self.session = session or create_session()
+_CARDS = etree.XPath(f"//div[{has_class('single-product', 'grid-v', 'single-product-v2')}]")
+_TITLE = etree.XPath(f".//*[{has_class('pro-title')}]//a[@itemprop='name' and @href]")
+_PRICE = etree.XPath(".//meta[@itemprop='price']")
 
-    def search(self, query: str, limit: int = 20):
-        results = []
-        page = 1
-        seen = set()
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
-        }
+class MacApplesParser(ShopParser):
+    shop = "MacApples"
+    base_url = "https://macapples.ru/search"
 
-        while len(results) < limit and page <= 2:
-            params = {"query": query,
-                      "page": page}
+    def params(self, query: str, page: int):
+        return {"query": query,
+                "page": page}
 
-            response = self.session.get(
-                self.base_url,
-                params=params,
-                headers=headers,
-                timeout=15
-            )
+    @staticmethod
+    def parse_page_lxml(html: str):
+        root = parse_html(html)
+        cards = _CARDS(root) if root is not None else []
+        if not cards:
+            return None
 
-            if response.status_code != 200:
-                print(f"MacApples HTTP {response.status_code}", flush=True)
-                break
+        rows = Rows(cards=len(cards))
+        for card in cards:
+            title_a = first(_TITLE, card)
+            if title_a is None:
+                continue
 
-            soup = BeautifulSoup(response.text, "lxml")
-            cards = soup.select("div.single-product.grid-v.single-product-v2")
-            if not cards:
-                break
+            title = stripped_text(title_a)
+            url = "https://macapples.ru/" + title_a.get("href").lstrip("/")
 
-            for card in cards:
-                if len(results) >= limit:
-                    break
+            price = None
+            price_meta = first(_PRICE, card)
+            if price_meta is not None:
+                price = int(float(price_meta.get("content")))
 
-                title_a = card.select_one('.pro-title a[itemprop="name"][href]')
-                if not title_a:
-                    continue
+            rows.append((title, url, price))
 
-                title = title_a.get_text(strip=True)
-                url = "https://macapples.ru/" + title_a["href"].lstrip("/")
+        return rows
 
-                if url in seen:
-                    continue
-                seen.add(url)
+    @staticmethod
+    def parse_page_soup(html: str):
+        soup = BeautifulSoup(html, "lxml")
+        cards = soup.select("div.single-product.grid-v.single-product-v2")
+        if not cards:
+            return None
 
-                price = int(float(card.select_one('meta[itemprop="price"]')["content"]))
+        rows = Rows(cards=len(cards))
+        for card in cards:
+            title_a = card.select_one('.pro-title a[itemprop="name"][href]')
+            if not title_a:
+                continue
 
-                attrs = parse_text(title)
+            title = title_a.get_text(strip=True)
+            url = "https://macapples.ru/" + title_a["href"].lstrip("/")
 
-                results.append({
-                    "shop": "MacApples",
-                    "title": title,
-                    "price": price,
-                    "url": url,
-                    "_attrs": attrs,
-                })
+            price = None
+            price_meta = card.select_one('meta[itemprop="price"]')
+            if price_meta:
+                price = int(float(price_meta["content"]))
 
-            page += 1
+            rows.append((title, url, price))
 
-        return results
\ No newline at end of file
+        return rows
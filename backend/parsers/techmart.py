@@ -1,76 +1,71 @@
 from bs4 import BeautifulSoup
+from lxml import etree
 
-from matching.parser import parse_text
-from core.http import create_session
+from parsers.base import Rows, ShopParser, digits, first, has_class, parse_html, stripped_text
 
 
-class TechmartParser:
-    base_url = "https://techmart.ru/index.php?route=product/search"
+_CARDS = etree.XPath(f"//*[@id='productlist']//div[{has_class('product__item')}]")
+_TITLE = etree.XPath(f".//a[{has_class('product__title')} and @href]")
+_PRICE = etree.XPath(f".//p[{has_class('product__price')}]")
 
-    def __init__(self, session=None):
-        self.session = session or create_session()
 
-    def search(self, query: str, limit: int = 20):
-        results = []
-        page = 1
-        seen = set()
+class TechmartParser(ShopParser):
+    shop = "Techmart"
+    base_url = "https://techmart.ru/index.php"
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
+    def params(self, query: str, page: int):
+        return {
+            "route": "product/search",
+            "search": query,
+            "page": page,
         }
 
-        while len(results) < limit and page <= 2:
-            params = {
-                "search": query,
-                "page": page,
-            }
-
-            response = self.session.get(
-                self.base_url,
-                params=params,
-                headers=headers,
-                timeout=15
-            )
-
-            if response.status_code != 200:
-                print(f"Techmart HTTP {response.status_code}", flush=True)
-                break
-
-            soup = BeautifulSoup(response.text, "lxml")
-            cards = soup.select("#productlist div.product__item")
-            if not cards:
-                break
-
-            for card in cards:
-                if len(results) >= limit:
-                    break
-
-                title_a = card.select_one("a.product__title[href]")
-                if not title_a:
-                    continue
-
-                title = title_a.get_text(strip=True)
-                url = title_a["href"]
-
-                if url in seen:
-                    continue
-                seen.add(url)
-
-                price_span = card.select_one("p.product__price")
-                if not price_span:
-                    continue
+    @staticmethod
+    def parse_page_lxml(html: str):
+        root = parse_html(html)
+        cards = _CARDS(root) if root is not None else []
+        if not cards:
+            return None
+
+        rows = Rows(cards=len(cards))
+        for card in cards:
+            title_a = first(_TITLE, card)
+            if title_a is None:
+                continue
+
+            title = stripped_text(title_a)
+            url = title_a.get("href")
+
+            price = None
+            price_span = first(_PRICE, card)
+            if price_span is not None:
+                price = digits(price_span.xpath("string()"))
+
+            rows.append((title, url, price))
+
+        return rows
+
+    @staticmethod
+    def parse_page_soup(html: str):
+        soup = BeautifulSoup(html, "lxml")
+        cards = soup.select("#productlist div.product__item")
+        if not cards:
+            return None
+
+        rows = Rows(cards=len(cards))
+        for card in cards:
+            title_a = card.select_one("a.product__title[href]")
+            if not title_a:
+                continue
+
+            title = title_a.get_text(strip=True)
+            url = title_a["href"]
+
+            price = None
+            price_span = card.select_one("p.product__price")
+            if price_span:
                 price = int("".join(ch for ch in price_span.get_text() if ch.isdigit()))
 
-                attrs = parse_text(title)
+            rows.append((title, url, price))
 
-                results.append({
-                    "shop": "Techmart",
-                    "title": title,
-                    "price": price,
-                    "url": url,
-                    "_attrs": attrs,
-                })
-
-            page += 1
-
-        return results
\ No newline at end of file
+        return rows
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from cachetools import TLRUCache
+
+from core.config import (
+    CACHE_BACKEND,
+    CACHE_BUSY_TIMEOUT,
+    CACHE_HARD_TTL,
+    CACHE_PATH,
+    CACHE_SOFT_TTL,
+    PARTIAL_CACHE_TTL,
+)
+
+
+Entry = tuple[dict, float]
+
+
+class MemoryBackend:
+    def __init__(self, maxsize: int = 512, ttl: float = CACHE_HARD_TTL):
+        self.ttl = ttl
+        self._entries: TLRUCache[str, Any] = TLRUCache(maxsize=maxsize, ttu=self._ttu)
+        self._lock = threading.Lock()
+
+    def _ttu(self, _key: str, value: Entry, now: float) -> float:
+        return now + self.ttl - max(0.0, time.time() - value[1])
+
+    def get(self, key: str) -> Entry | None:
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key: str, payload: dict, stored_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (payload, stored_at)
+
+
+class SqliteBackend:
+    purge_every = 200
+
+    def __init__(self, path: str | Path = CACHE_PATH, ttl: float = CACHE_HARD_TTL, busy_timeout: float = CACHE_BUSY_TIMEOUT):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._writes = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, payload TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Entry | None:
+        row = self._conn().execute(
+            "SELECT payload, stored_at FROM results WHERE key = ? AND stored_at > ?",
+            (key, time.time() - self.ttl),
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, payload: dict, stored_at: float) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, payload, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(payload, ensure_ascii=False), stored_at),
+            )
+            self._writes += 1
+            if self._writes % self.purge_every == 0:
+                conn.execute("DELETE FROM results WHERE stored_at <= ?", (time.time() - self.ttl,))
+
+
+def create_backend(name: str = CACHE_BACKEND):
+    if name == "sqlite":
+        return SqliteBackend()
+    if name == "memory":
+        return None
+    raise ValueError(f"Unknown cache backend: {name}")
+
+
+class ResultCache:
+    def __init__(
+        self,
+        maxsize: int = 512,
+        soft_ttl: float = CACHE_SOFT_TTL,
+        hard_ttl: float = CACHE_HARD_TTL,
+        partial_ttl: float = PARTIAL_CACHE_TTL,
+        backend=None,
+    ):
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.partial_ttl = partial_ttl
+        self.l1 = MemoryBackend(maxsize=maxsize, ttl=hard_ttl)
+        self.l2 = backend
+
+    def get(self, key: str) -> tuple[dict, float, bool] | None:
+        entry = self.l1.get(key)
+        if self._needs_l2(entry):
+            entry = self._merge(key, entry, self._l2_get(key))
+        return self._result(entry)
+
+    async def aget(self, key: str) -> tuple[dict, float, bool] | None:
+        entry = self.l1.get(key)
+        if self._needs_l2(entry):
+            entry = self._merge(key, entry, await asyncio.to_thread(self._l2_get, key))
+        return self._result(entry)
+
+    def set(self, key: str, payload: dict) -> None:
+        stored_at = time.time()
+        self.l1.set(key, payload, stored_at)
+        if self.l2 is not None:
+            self._l2_set(key, payload, stored_at)
+
+    async def aset(self, key: str, payload: dict) -> None:
+        stored_at = time.time()
+        self.l1.set(key, payload, stored_at)
+        if self.l2 is not None:
+            await asyncio.to_thread(self._l2_set, key, payload, stored_at)
+
+    def _needs_l2(self, entry: Entry | None) -> bool:
+        return self.l2 is not None and (entry is None or self._is_stale(*entry))
+
+    def _merge(self, key: str, entry: Entry | None, shared: Entry | None) -> Entry | None:
+        if shared is not None and (entry is None or shared[1] > entry[1]):
+            self.l1.set(key, *shared)
+            return shared
+        return entry
+
+    def _result(self, entry: Entry | None) -> tuple[dict, float, bool] | None:
+        if entry is None:
+            return None
+        payload, stored_at = entry
+        return payload, max(0.0, time.time() - stored_at), self._is_stale(payload, stored_at)
+
+    def _l2_set(self, key: str, payload: dict, stored_at: float) -> None:
+        try:
+            self.l2.set(key, payload, stored_at)
+        except sqlite3.Error as e:
+            print(f"Cache error: {e}", flush=True)
+
+    def _l2_get(self, key: str) -> Entry | None:
+        try:
+            return self.l2.get(key)
+        except sqlite3.Error as e:
+            print(f"Cache error: {e}", flush=True)
+            return None
+
+    def _is_stale(self, payload: dict, stored_at: float) -> bool:
+        soft_ttl = self.partial_ttl if payload.get("partial") else self.soft_ttl
+        return time.time() - stored_at >= soft_ttl
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Mapping
+
+from core.config import CATALOG_INTERVAL, CATALOG_LIMIT, CATALOG_QUERIES
+from core.health import HEALTH
+from core.parsers import PARSERS
+
+
+KEY_FIELDS = ("category", "model", "line", "storage", "size", "chip", "color")
+
+# "line" is left out: the matcher treats a missing iPhone line as "base",
+# so an exact posting lookup would drop offers it would accept.
+_LOOKUP_FIELDS = ("category", "model", "storage", "size", "chip", "color")
+
+
+def _key(attrs: Mapping[str, Any]) -> tuple:
+    return tuple(attrs.get(field) for field in KEY_FIELDS)
+
+
+class CatalogIndex:
+    def __init__(self, offers: dict[str, list[dict]], shops: dict[str, str], built_at: float | None = None):
+        self.offers = offers
+        self.shops = shops
+        self.built_at = time.time() if built_at is None else built_at
+        self.entries: dict[tuple, list[dict]] = {}
+        self.postings: dict[tuple[str, Any], set[tuple]] = {}
+
+        for items in offers.values():
+            for item in items:
+                key = _key(item["_attrs"])
+                self.entries.setdefault(key, []).append(item)
+
+        for key in self.entries:
+            for field, value in zip(KEY_FIELDS, key):
+                if field in _LOOKUP_FIELDS and value is not None:
+                    self.postings.setdefault((field, value), set()).add(key)
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self.entries.values())
+
+    def age(self) -> float:
+        return max(0.0, time.time() - self.built_at)
+
+    def lookup(self, query_attrs: Mapping[str, Any]) -> dict[str, list[dict]]:
+        postings = []
+        for field in _LOOKUP_FIELDS:
+            value = query_attrs.get(field)
+            if value is None:
+                continue
+            keys = self.postings.get((field, value))
+            if not keys:
+                return {}
+            postings.append(keys)
+
+        if postings:
+            postings.sort(key=len)
+            keys = set.intersection(*postings)
+        else:
+            keys = self.entries.keys()
+
+        by_shop: dict[str, list[dict]] = {}
+        for key in keys:
+            for item in self.entries[key]:
+                by_shop.setdefault(item["shop"], []).append(dict(item))
+        return by_shop
+
+
+class Catalog:
+    def __init__(
+        self,
+        parsers: list,
+        queries: tuple[str, ...] = CATALOG_QUERIES,
+        interval: float = CATALOG_INTERVAL,
+        limit: int = CATALOG_LIMIT,
+    ):
+        self.parsers = parsers
+        self.queries = queries
+        self.interval = interval
+        self.limit = limit
+        self.index: CatalogIndex | None = None
+
+    async def _crawl_shop(self, parser) -> tuple[str, list[dict]]:
+        if not HEALTH.allow(parser.shop, parser.timeout):
+            return "skipped", []
+
+        offers = []
+        seen = set()
+        status = "ok"
+        for query in self.queries:
+            try:
+                items = await parser.asearch(query, self.limit)
+            except Exception as e:
+                print(f"Catalog error: {parser.shop}: {e}", flush=True)
+                status = "error"
+                continue
+
+            for item in items:
+                if item["url"] in seen:
+                    continue
+                seen.add(item["url"])
+                offers.append({**item, "_attrs": dict(item["_attrs"])})
+        return status, offers
+
+    async def crawl(self) -> CatalogIndex:
+        results = await asyncio.gather(*(self._crawl_shop(parser) for parser in self.parsers))
+
+        previous = self.index
+        offers = {}
+        shops = {}
+        for parser, (status, items) in zip(self.parsers, results):
+            shops[parser.shop] = status
+            if not items and previous is not None:
+                items = previous.offers.get(parser.shop, [])
+            offers[parser.shop] = items
+
+        self.index = CatalogIndex(offers, shops)
+        return self.index
+
+    async def run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            index = await self.crawl()
+            print(f"Catalog: {len(index)} offers in {time.perf_counter() - started:.1f}s", flush=True)
+            await asyncio.sleep(self.interval)
+
+
+CATALOG = Catalog(PARSERS)
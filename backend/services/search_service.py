@@ -1,21 +1,31 @@
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import heapq
 import re
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from typing import Any, Mapping, NamedTuple
 
-from cachetools import TTLCache
-
-from matching.matcher import pick_best
+from core.config import BATCH_CONCURRENCY, SEARCH_DEADLINE
+from core.health import HEALTH
+from core.metrics import CACHE_LOOKUPS, SHOP_ERRORS, SHOP_ITEMS, SHOP_MATCHES
+from matching.matcher import perfect_match, pick_top
 from matching.parser import parse_text
 from core.parsers import PARSERS
+from core.singleflight import SingleFlight
+from core.timing import stage
+from services.cache import ResultCache, create_backend
+from services.catalog import CATALOG
 
 
 _PRICE_INT_RE = re.compile(r"\d+")
 
-_CACHE: TTLCache[str, Any] = TTLCache(maxsize=512, ttl=300)
-_CACHE_LOCK = threading.Lock()
+
+_CACHE = ResultCache(maxsize=512, backend=create_backend())
+
+_FLIGHTS = SingleFlight()
 
 
 def _price_int(value) -> int:
@@ -39,52 +49,432 @@ def _color_tokens(color) -> list[str]:
     return str(color).replace("_", " ").strip().split()
 
 
+def _payload(results: list, shops: dict[str, str] | None = None) -> dict:
+    shops = shops or {}
+    return {
+        "results": results,
+        "shops": shops,
+        "partial": any(status != "ok" for status in shops.values()),
+    }
+
+
+def _offer_price(offer: dict) -> int:
+    return _price_int(offer.get("price"))
+
+
+def _observe_shop(shop: str, items: list, top: list) -> None:
+    SHOP_ITEMS.labels(shop).inc(len(items))
+    SHOP_MATCHES.labels(shop, "matched" if top else "unmatched").inc()
+
+
+def _with_age(payload: dict, age: float, stale: bool) -> dict:
+    return {**payload, "age": round(age, 1), "stale": stale}
+
+
+_COMPARE_ATTRS = {
+    "iphone": ("model", "storage", "color"),
+    "macbook": ("size", "chip", "storage", "color"),
+    "ipad": ("size", "storage", "color"),
+    "airpods": ("model", "color"),
+}
+
+_COMPARE_NUMBER_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(tb)?")
+
+
+def _compare_key(value: str | None) -> tuple:
+    if value is None:
+        return (2, 0.0, "")
+    m = _COMPARE_NUMBER_RE.match(value)
+    if m is None:
+        return (1, 0.0, value)
+    return (0, float(m.group(1)) * (1024 if m.group(2) else 1), value)
+
+
+def _compare_rows(per_shop: dict[str, list[dict]], query_attrs: Mapping[str, Any], dims: list[str]) -> list[dict]:
+    cells: dict[tuple, dict[str, list[dict]]] = {}
+    for shop, items in per_shop.items():
+        for item in items:
+            attrs = item.get("_attrs")
+            if not isinstance(attrs, Mapping):
+                attrs = item["_attrs"] = parse_text(item.get("title") or "")
+            values = tuple(attrs.get(dim) for dim in dims)
+            cells.setdefault(values, {}).setdefault(shop, []).append(item)
+
+    rows = []
+    for values, by_shop in cells.items():
+        cell_attrs = {**query_attrs, **{dim: value for dim, value in zip(dims, values) if value is not None}}
+        offers = {}
+        for shop, items in by_shop.items():
+            top = pick_top(items, cell_attrs, 1)
+            if top:
+                offer = top[0]
+                offers[shop] = {"title": offer["title"], "price": offer["price"], "url": offer["url"]}
+        if offers:
+            rows.append({
+                "attrs": dict(zip(dims, values)),
+                "min_price": min(_offer_price(offer) for offer in offers.values()),
+                "offers": offers,
+            })
+
+    rows.sort(key=lambda row: tuple(_compare_key(None if v is None else str(v)) for v in row["attrs"].values()))
+    return rows
+
+
+def _compare_payload(rows: list[dict], dims: list[str], shops: dict[str, str] | None = None) -> dict:
+    results = rows or [{"type": "none", "message": "Ничего не найдено"}]
+    return {**_payload(results, shops), "group_by": dims}
+
+
+class SearchPlan(NamedTuple):
+    query_attrs: Mapping[str, Any]
+    search_query: str
+    cache_key: str
+    top_k: int = 1
+
+
 class SearchService:
-    def search(self, raw_query: str):
-        raw_query = (raw_query or "").strip()
-        if len(raw_query) < 2:
-            return [{"type": "hint", "message": "Уточните, пожалуйста, ваш запрос"}]
+    def __init__(self, deadline: float = SEARCH_DEADLINE, batch_concurrency: int = BATCH_CONCURRENCY):
+        self.deadline = deadline
+        self._batch_slots = asyncio.Semaphore(batch_concurrency)
 
-        query_attrs = parse_text(raw_query)
-        if self._is_ambiguous_query(query_attrs):
-            return [{"type": "hint", "message": "Уточните, пожалуйста, ваш запрос"}]
+    def search(self, raw_query: str, top_k: int = 1):
+        plan = self._prepare(raw_query, top_k)
+        if not isinstance(plan, SearchPlan):
+            return plan
+
+        indexed = self._from_catalog(plan)
+        if indexed is not None:
+            return indexed
 
+        def run():
+            return self._run(plan)
+
+        cached = self._cached(plan.cache_key)
+        if cached is not None:
+            if cached["stale"] and not _FLIGHTS.running(plan.cache_key):
+                threading.Thread(target=_FLIGHTS.do, args=(plan.cache_key, run), daemon=True).start()
+            return cached
+
+        return _FLIGHTS.do(plan.cache_key, run)
+
+    async def asearch(self, raw_query: str, top_k: int = 1):
+        plan = self._prepare(raw_query, top_k)
+        if not isinstance(plan, SearchPlan):
+            return plan
+        return await self._asearch_plan(plan)
+
+    async def abatch(self, raw_queries: list[str], top_k: int = 1):
+        groups: dict[str, tuple[SearchPlan, list[int]]] = {}
+        for index, raw_query in enumerate(raw_queries):
+            plan = self._prepare(raw_query, top_k)
+            if not isinstance(plan, SearchPlan):
+                yield [index], plan
+                continue
+            groups.setdefault(plan.cache_key, (plan, []))[1].append(index)
+
+        async def run(plan: SearchPlan):
+            async with self._batch_slots:
+                return await self._asearch_plan(plan)
+
+        tasks = {asyncio.create_task(run(plan)): indices for plan, indices in groups.values()}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        payload = task.result()
+                    except Exception as e:
+                        print(f"Batch error: {e}", flush=True)
+                        payload = _payload([{"type": "error", "message": "Ошибка поиска"}])
+                    yield tasks[task], payload
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def acompare(self, raw_query: str, group_by: list[str] | None = None):
+        raw_query = (raw_query or "").strip()
+        query_attrs = parse_text(raw_query) if len(raw_query) >= 2 else {}
+        category = query_attrs.get("category")
+        if category not in _COMPARE_ATTRS:
+            return _payload([{"type": "hint", "message": "Уточните, пожалуйста, ваш запрос"}])
+
+        unknown = [dim for dim in group_by or [] if dim not in _COMPARE_ATTRS[category]]
+        if unknown:
+            return _payload([{
+                "type": "hint",
+                "message": (
+                    f"Нельзя сгруппировать по: {', '.join(unknown)}. "
+                    f"Доступно: {', '.join(_COMPARE_ATTRS[category])}"
+                ),
+            }])
+
+        dims = [
+            dim for dim in _COMPARE_ATTRS[category]
+            if query_attrs.get(dim) is None and (not group_by or dim in group_by)
+        ]
         search_query = self._build_search_query(query_attrs, raw_query)
+        cache_key = f"cmp::{','.join(dims)}::{search_query.lower().strip()}"
+
+        index = CATALOG.index
+        if index is not None:
+            with stage("catalog"):
+                rows = _compare_rows(index.lookup(query_attrs), query_attrs, dims)
+            if rows:
+                return _with_age(_compare_payload(rows, dims, dict(index.shops)), index.age(), False)
+
+        async def run():
+            per_shop = {}
+            shops = {}
+            async for shop, status, items in self._afetch(search_query):
+                shops[shop] = status
+                per_shop[shop] = items
+            with stage("compare"):
+                payload = _compare_payload(_compare_rows(per_shop, query_attrs, dims), dims, shops)
+            await _CACHE.aset(cache_key, payload)
+            return _with_age(payload, 0.0, False)
+
+        cached = await self._acached(cache_key)
+        if cached is not None:
+            if cached["stale"]:
+                _FLIGHTS.astart(cache_key, run)
+            return cached
+
+        return await _FLIGHTS.ado(cache_key, run)
+
+    async def _asearch_plan(self, plan: SearchPlan):
+        indexed = self._from_catalog(plan)
+        if indexed is not None:
+            return indexed
 
-        cache_key = f"v1::{search_query.lower().strip()}"
-        with _CACHE_LOCK:
-            cached = _CACHE.get(cache_key)
+        def run():
+            return self._arun(plan)
+
+        cached = await self._acached(plan.cache_key)
         if cached is not None:
+            if cached["stale"]:
+                _FLIGHTS.astart(plan.cache_key, run)
             return cached
 
-        results = []
+        return await _FLIGHTS.ado(plan.cache_key, run)
+
+    async def astream(self, raw_query: str, top_k: int = 1):
+        plan = self._prepare(raw_query, top_k)
+        if not isinstance(plan, SearchPlan):
+            yield {"type": "done", **plan}
+            return
 
-        with ThreadPoolExecutor(max_workers=len(PARSERS)) as ex:
-            futures = [ex.submit(parser.search, search_query, 30) for parser in PARSERS]
-            for fut in as_completed(futures):
+        indexed = self._from_catalog(plan)
+        if indexed is not None:
+            yield {"type": "done", **indexed}
+            return
+
+        cached = await self._acached(plan.cache_key)
+        if cached is not None:
+            if cached["stale"]:
+                _FLIGHTS.astart(plan.cache_key, lambda: self._arun(plan))
+            yield {"type": "done", **cached}
+            return
+
+        offers: asyncio.Queue = asyncio.Queue()
+        task, leader = _FLIGHTS.astart(plan.cache_key, lambda: self._arun(plan, on_offer=offers.put_nowait))
+
+        if leader:
+            while (offer := await offers.get()) is not None:
+                yield {"type": "offer", "item": offer}
+            payload = await asyncio.shield(task)
+        else:
+            payload = await asyncio.shield(task)
+            for offer in payload["results"]:
+                if "type" not in offer:
+                    yield {"type": "offer", "item": offer}
+
+        yield {"type": "done", **payload}
+
+    def _run(self, plan: SearchPlan):
+        per_shop = []
+        shops = {}
+
+        for shop, status, items in self._fetch(plan.search_query, self._stop(plan)):
+            shops[shop] = status
+            with stage(f"match.{shop}"):
+                top = self._top(items, plan)
+            if status == "ok":
+                _observe_shop(shop, items, top)
+            if top:
+                per_shop.append(top)
+
+        return self._finish(plan.cache_key, per_shop, shops)
+
+    async def _arun(self, plan: SearchPlan, on_offer=None):
+        per_shop = []
+        shops = {}
+
+        try:
+            async for shop, status, items in self._afetch(plan.search_query, self._stop(plan)):
+                shops[shop] = status
+                with stage(f"match.{shop}"):
+                    top = self._top(items, plan)
+                if status == "ok":
+                    _observe_shop(shop, items, top)
+                if top:
+                    per_shop.append(top)
+                    if on_offer is not None:
+                        for offer in top:
+                            on_offer(offer)
+        finally:
+            if on_offer is not None:
+                on_offer(None)
+
+        return await self._afinish(plan.cache_key, per_shop, shops)
+
+    def _fetch(self, search_query: str, stop=None):
+        parsers = []
+        for parser in PARSERS:
+            if HEALTH.allow(parser.shop, parser.timeout):
+                parsers.append(parser)
+            else:
+                yield parser.shop, "skipped", []
+        if not parsers:
+            return
+
+        ex = ThreadPoolExecutor(max_workers=len(parsers))
+        futures = {
+            ex.submit(contextvars.copy_context().run, parser.search, search_query, 30, stop): parser
+            for parser in parsers
+        }
+        pending = set(futures)
+        try:
+            for fut in as_completed(futures, timeout=self.deadline):
+                pending.discard(fut)
+                shop = futures[fut].shop
                 try:
                     items = fut.result() or []
                 except Exception as e:
                     print(f"Parser error: {e}", flush=True)
+                    yield shop, "error", []
                     continue
 
-                best = pick_best(items, query_attrs)
-                if best:
-                    best.pop("_attrs", None)
-                    results.append(best)
-
-        if not results:
-            none_payload = [{"type": "none", "message": "Ничего не найдено"}]
-            with _CACHE_LOCK:
-                _CACHE[cache_key] = none_payload
-            return none_payload
-
-        results.sort(key=lambda x: _price_int(x.get("price")))
+                yield shop, "ok", items
+        except FuturesTimeoutError:
+            for fut in pending:
+                HEALTH.record_failure(futures[fut].shop, "deadline", self.deadline)
+                SHOP_ERRORS.labels(futures[fut].shop, "deadline").inc()
+                yield futures[fut].shop, "timeout", []
+        finally:
+            ex.shutdown(wait=False, cancel_futures=True)
+
+    async def _afetch(self, search_query: str, stop=None):
+        loop = asyncio.get_running_loop()
+        until = loop.time() + self.deadline
+        tasks = {}
+        for parser in PARSERS:
+            if HEALTH.allow(parser.shop, parser.timeout):
+                tasks[asyncio.create_task(parser.asearch(search_query, 30, stop))] = parser
+            else:
+                yield parser.shop, "skipped", []
+        pending = set(tasks)
+        try:
+            while pending:
+                timeout = until - loop.time()
+                if timeout <= 0:
+                    break
+
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    shop = tasks[task].shop
+                    try:
+                        items = task.result() or []
+                    except Exception as e:
+                        print(f"Parser error: {e}", flush=True)
+                        yield shop, "error", []
+                        continue
+
+                    yield shop, "ok", items
+
+            for task in pending:
+                HEALTH.record_failure(tasks[task].shop, "deadline", self.deadline)
+                SHOP_ERRORS.labels(tasks[task].shop, "deadline").inc()
+                yield tasks[task].shop, "timeout", []
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _prepare(self, raw_query: str, top_k: int = 1):
+        raw_query = (raw_query or "").strip()
+        if len(raw_query) < 2:
+            return _payload([{"type": "hint", "message": "Уточните, пожалуйста, ваш запрос"}])
 
-        with _CACHE_LOCK:
-            _CACHE[cache_key] = results
+        query_attrs = parse_text(raw_query)
+        if self._is_ambiguous_query(query_attrs):
+            return _payload([{"type": "hint", "message": "Уточните, пожалуйста, ваш запрос"}])
 
-        return results
+        search_query = self._build_search_query(query_attrs, raw_query)
+        cache_key = f"v3::{top_k}::{search_query.lower().strip()}"
+
+        return SearchPlan(query_attrs, search_query, cache_key, top_k)
+
+    def _cached(self, cache_key: str) -> dict | None:
+        with stage("cache"):
+            hit = _CACHE.get(cache_key)
+        return self._hit(hit)
+
+    async def _acached(self, cache_key: str) -> dict | None:
+        with stage("cache"):
+            hit = await _CACHE.aget(cache_key)
+        return self._hit(hit)
+
+    def _hit(self, hit: tuple[dict, float, bool] | None) -> dict | None:
+        if hit is None:
+            CACHE_LOOKUPS.labels("miss").inc()
+            return None
+        payload, age, stale = hit
+        CACHE_LOOKUPS.labels("stale" if stale else "hit").inc()
+        return _with_age(payload, age, stale)
+
+    def _from_catalog(self, plan: SearchPlan) -> dict | None:
+        index = CATALOG.index
+        if index is None:
+            return None
+
+        per_shop = []
+        with stage("catalog"):
+            for items in index.lookup(plan.query_attrs).values():
+                top = self._top(items, plan)
+                if top:
+                    per_shop.append(top)
+        if not per_shop:
+            return None
+
+        results = list(heapq.merge(*per_shop, key=_offer_price))
+        return _with_age(_payload(results, dict(index.shops)), index.age(), False)
+
+    def _stop(self, plan: SearchPlan):
+        if plan.top_k != 1:
+            return None
+        return perfect_match(plan.query_attrs)
+
+    def _top(self, items: list, plan: SearchPlan) -> list[dict]:
+        top = pick_top(items, plan.query_attrs, plan.top_k)
+        for offer in top:
+            offer.pop("_attrs", None)
+        top.sort(key=_offer_price)
+        return top
+
+    def _finish(self, cache_key: str, per_shop: list[list[dict]], shops: dict[str, str]):
+        payload = self._merged(per_shop, shops)
+        _CACHE.set(cache_key, payload)
+        return _with_age(payload, 0.0, False)
+
+    async def _afinish(self, cache_key: str, per_shop: list[list[dict]], shops: dict[str, str]):
+        payload = self._merged(per_shop, shops)
+        await _CACHE.aset(cache_key, payload)
+        return _with_age(payload, 0.0, False)
+
+    def _merged(self, per_shop: list[list[dict]], shops: dict[str, str]) -> dict:
+        if not per_shop:
+            return _payload([{"type": "none", "message": "Ничего не найдено"}], shops)
+        return _payload(list(heapq.merge(*per_shop, key=_offer_price)), shops)
 
     def _build_search_query(self, attrs: dict, raw: str) -> str:
         cat = attrs.get("category")
@@ -56,6 +56,63 @@
     table.hidden = items.length === 0;
   }
 
+  function sortByPrice(items) {
+    return items.sort((a, b) => {
+      const pa = Number(a?.price);
+      const pb = Number(b?.price);
+      if (!Number.isFinite(pa) && !Number.isFinite(pb)) return 0;
+      if (!Number.isFinite(pa)) return 1;
+      if (!Number.isFinite(pb)) return -1;
+      return pa - pb;
+    });
+  }
+
+  async function readEvents(resp, onEvent) {
+    const reader = resp.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let nl;
+      while ((nl = buffer.indexOf('\n')) >= 0) {
+        const line = buffer.slice(0, nl).trim();
+        buffer = buffer.slice(nl + 1);
+        if (line) onEvent(JSON.parse(line));
+      }
+    }
+
+    const rest = buffer.trim();
+    if (rest) onEvent(JSON.parse(rest));
+  }
+
+  function unansweredShops(shops) {
+    return Object.entries(shops || {})
+      .filter(([, status]) => status !== 'ok')
+      .map(([shop]) => shop);
+  }
+
+  function renderFinal(data, shops) {
+    if (!Array.isArray(data)) {
+      setMessage('Неожиданный формат ответа.');
+      return;
+    }
+
+    if (data.length && typeof data[0] === 'object' && data[0] && data[0].type) {
+      clearTable();
+      setMessage(data[0].message || 'Нет данных.');
+      return;
+    }
+
+    renderRows(sortByPrice(data));
+    const missing = unansweredShops(shops);
+    const note = missing.length ? ` (не ответили: ${missing.join(', ')})` : '';
+    setMessage((data.length ? `Найдено: ${data.length}` : 'Ничего не найдено') + note);
+  }
+
   async function doSearch() {
     const q = (input.value || '').trim();
     if (q.length < 2) {
@@ -70,38 +127,31 @@
     input.disabled = true;
 
     try {
-      const resp = await fetch(`/search?q=${encodeURIComponent(q)}`, {
-        headers: { 'Accept': 'application/json' },
+      const resp = await fetch(`/search/stream?q=${encodeURIComponent(q)}`, {
+        headers: { 'Accept': 'application/x-ndjson' },
       });
 
       if (!resp.ok) {
         throw new Error(`HTTP ${resp.status}`);
       }
 
-      const data = await resp.json();
-
-      if (!Array.isArray(data)) {
-        setMessage('Неожиданный формат ответа.');
-        return;
-      }
-
-      if (data.length && typeof data[0] === 'object' && data[0] && data[0].type) {
-        clearTable();
-        setMessage(data[0].message || 'Нет данных.');
-        return;
-      }
-
-      data.sort((a, b) => {
-        const pa = Number(a?.price);
-        const pb = Number(b?.price);
-        if (!Number.isFinite(pa) && !Number.isFinite(pb)) return 0;
-        if (!Number.isFinite(pa)) return 1;
-        if (!Number.isFinite(pb)) return -1;
-        return pa - pb;
+      const partial = [];
+      let finished = false;
+
+      await readEvents(resp, (event) => {
+        if (event.type === 'offer') {
+          partial.push(event.item);
+          renderRows(sortByPrice(partial));
+          setMessage(`Найдено: ${partial.length}, ищем дальше…`);
+        } else if (event.type === 'done') {
+          finished = true;
+          renderFinal(event.results, event.shops);
+        }
       });
 
-      renderRows(data);
-      setMessage(data.length ? `Найдено: ${data.length}` : 'Ничего не найдено');
+      if (!finished) {
+        throw new Error('поток прерван');
+      }
     } catch (e) {
       clearTable();
       setMessage(`Ошибка запроса: ${e?.message || e}`);